@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+
+import lib.load_test as load_test
+
+
+def parse_args() -> load_test.LoadTestSettings:
+    parser = argparse.ArgumentParser(description="Scheduler load test with stub sync engine")
+    parser.add_argument("--jobs", type=int, default=10_000, help="number of repos")
+    parser.add_argument("--duration", type=float, default=60.0, help="measurement duration in seconds")
+    parser.add_argument("--workers", type=int, default=32, help="executor workers")
+    parser.add_argument("--latency-mean", type=float, default=0.05, help="stub sync latency mean in seconds")
+    parser.add_argument("--latency-stddev", type=float, default=0.02, help="stub sync latency stddev in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.01, help="stub sync failure probability")
+    parser.add_argument("--success-delay", type=int, default=30, help="delay after success in seconds")
+    parser.add_argument("--retry-delay", type=int, default=10, help="delay after failure in seconds")
+    parser.add_argument("--startup-spread", type=int, default=5, help="startup delay and jitter in seconds")
+    parser.add_argument("--lag-interval", type=float, default=0.1, help="event loop lag sample interval in seconds")
+    parser.add_argument("--warmup", type=float, default=1.0, help="time after startup before measurement")
+    parser.add_argument("--seed", type=int, default=None, help="random seed of stub")
+    args = parser.parse_args()
+
+    return load_test.LoadTestSettings(
+        jobs=args.jobs,
+        duration=args.duration,
+        workers=args.workers,
+        latency_mean=args.latency_mean,
+        latency_stddev=args.latency_stddev,
+        failure_rate=args.failure_rate,
+        success_delay=args.success_delay,
+        retry_delay=args.retry_delay,
+        startup_spread=args.startup_spread,
+        lag_interval=args.lag_interval,
+        warmup=args.warmup,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    settings = parse_args()
+    report = asyncio.run(load_test.run(settings))
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
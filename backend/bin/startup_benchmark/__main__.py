@@ -0,0 +1,26 @@
+import argparse
+import asyncio
+
+import lib.load_test as load_test
+
+
+def parse_args() -> load_test.StartupBenchmarkSettings:
+    parser = argparse.ArgumentParser(description="Startup time benchmark for large repos lists")
+    parser.add_argument("--repos", type=int, default=10_000, help="number of repos")
+    parser.add_argument("--filter-sets", type=int, default=10, help="number of distinct ref filter sets")
+    args = parser.parse_args()
+
+    return load_test.StartupBenchmarkSettings(
+        repos=args.repos,
+        filter_sets=args.filter_sets,
+    )
+
+
+def main() -> None:
+    settings = parse_args()
+    report = asyncio.run(load_test.run_startup_benchmark(settings))
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
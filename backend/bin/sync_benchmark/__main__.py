@@ -0,0 +1,34 @@
+import argparse
+
+import lib.load_test as load_test
+
+
+def parse_args() -> load_test.EngineBenchmarkSettings:
+    parser = argparse.ArgumentParser(description="Sync engines benchmark on many small local repos")
+    parser.add_argument("--repos", type=int, default=50, help="number of repos")
+    parser.add_argument("--rounds", type=int, default=5, help="number of incremental sync rounds")
+    parser.add_argument("--branches", type=int, default=5, help="number of branches per repo besides main")
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=["cli", "dulwich"],
+        help="engine to benchmark, can be repeated, all engines by default",
+    )
+    args = parser.parse_args()
+
+    return load_test.EngineBenchmarkSettings(
+        repos=args.repos,
+        rounds=args.rounds,
+        branches=args.branches,
+        engines=args.engine or ["cli", "dulwich"],
+    )
+
+
+def main() -> None:
+    settings = parse_args()
+    report = load_test.run_engine_benchmark(settings)
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
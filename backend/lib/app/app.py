@@ -1,5 +1,5 @@
 import asyncio
-import concurrent.futures
+import functools
 import logging
 import typing
 
@@ -8,8 +8,11 @@ import lib.app.settings as app_settings
 import lib.git.tasks as git_tasks
 import lib.utils.aiojobs as aiojobs_utils
 import lib.utils.asyncio as asyncio_utils
+import lib.utils.event_feed as event_feed_utils
+import lib.utils.git as git_utils
 import lib.utils.lifecycle_manager as lifecycle_manager_utils
 import lib.utils.logging as logging_utils
+import lib.utils.profiling as profiling_utils
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +29,11 @@ class Application:
         self._aiojobs_scheduler = aiojobs_scheduler
 
     @classmethod
-    def from_settings(cls, settings: app_settings.Settings) -> typing.Self:
+    def from_settings(
+        cls,
+        settings: app_settings.Settings,
+        sync_repo: git_utils.SyncRepoCallable = git_utils.sync_repo,
+    ) -> typing.Self:
         # Logging
 
         logging_utils.initialize(
@@ -39,30 +46,111 @@ class Application:
         logger.info("Initializing application")
 
         logger.info("Initializing scheduler")
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=settings.scheduler.executor_max_workers)
+        lanes = {
+            name: aiojobs_utils.Lane.from_max_workers(name=name, max_workers=max_workers)
+            for name, max_workers in settings.scheduler.lane_max_workers.items()
+        }
+        heavy_lane = None
+        if settings.scheduler.heavy_lane is not None:
+            heavy_lane = lanes[settings.scheduler.heavy_lane]
         aiojobs_scheduler = aiojobs_utils.Scheduler.from_settings(
             settings=settings.scheduler.aiojobs_scheduler_settings
         )
+        bundle_cache = settings.bundles.bundle_cache
+        dulwich_repo_count = sum(1 for repo in settings.repos if repo.engine == "dulwich")
+        if bundle_cache is not None and dulwich_repo_count > 0:
+            logger.warning("Bundle cache is not used by %d repos with dulwich engine", dulwich_repo_count)
+        sync_stats_store = settings.scheduler.sync_stats_store
+        memory_budget = None
+        memory_budget_bytes = settings.resources.memory_budget_bytes
+        if memory_budget_bytes is not None:
+            logger.info("Memory budget of syncs with memory limit is %d bytes", memory_budget_bytes)
+            memory_budget = git_utils.MemoryBudget(total=memory_budget_bytes)
+        event_feed = None
+        if settings.events.enabled:
+            logger.info("Initializing event feed")
+            event_feed = event_feed_utils.EventFeed(
+                file_path=settings.events.file_path,
+                socket_path=settings.events.socket_path,
+            )
+        lfs_cache = settings.lfs.lfs_cache
+        ssh_control_masters = settings.ssh.control_masters
+        ssh_multiplexing = None
+        if ssh_control_masters is not None:
+            ssh_multiplexing = ssh_control_masters.multiplexing
+            logger.info("SSH connections are multiplexed through %s", ssh_multiplexing.control_dir)
 
-        for repo in settings.repos:
-            aiojobs_scheduler.defer_job(
-                git_tasks.GitSyncRepoJob(
-                    task=repo.to_dataclass,
-                    executor=executor,
-                    startup_delay=settings.scheduler.startup_delay,
-                    success_delay=settings.scheduler.success_delay,
-                    retry_delay=settings.scheduler.retry_delay,
-                    startup_jitter=settings.scheduler.startup_jitter,
-                    success_jitter=settings.scheduler.success_jitter,
-                    retry_jitter=settings.scheduler.retry_jitter,
-                    one_time=settings.scheduler.one_time,
-                )
+        aiojobs_scheduler.defer_lazy_jobs(
+            git_tasks.GitSyncRepoJob(
+                task=repo.to_dataclass,
+                lane=lanes[repo.lane or app_settings.DEFAULT_LANE],
+                startup_delay=settings.scheduler.startup_delay,
+                success_delay=settings.scheduler.success_delay,
+                retry_delay=settings.scheduler.retry_delay,
+                startup_jitter=settings.scheduler.startup_jitter,
+                success_jitter=settings.scheduler.success_jitter,
+                retry_jitter=settings.scheduler.retry_jitter,
+                one_time=settings.scheduler.one_time,
+                priority=repo.priority,
+                bundle_cache=bundle_cache,
+                # Explicitly assigned repos stay in their lane
+                heavy_lane=heavy_lane if repo.lane is None else None,
+                heavy_duration=settings.scheduler.heavy_duration,
+                heavy_size=settings.scheduler.heavy_size,
+                sync_stats_store=sync_stats_store,
+                sync_repo=sync_repo,
+                memory_budget=memory_budget,
+                event_feed=event_feed,
+                ssh_multiplexing=ssh_multiplexing,
+                lfs_cache=lfs_cache,
+            )
+            for repo in settings.repos
+        )
+
+        monitor = None
+        if settings.monitor.enabled:
+            logger.info("Initializing monitor")
+            monitor = aiojobs_utils.Monitor(
+                lanes=list(lanes.values()),
+                sample_interval=settings.monitor.sample_interval,
+                report_interval=settings.monitor.report_interval,
+                loop_lag_warning=settings.monitor.loop_lag_warning,
+                queued_warning=settings.monitor.queued_warning,
+                metrics_path=settings.monitor.metrics_path,
+                metrics_prefix="git_syncer",
+            )
+
+        profiler = None
+        if settings.profiling.enabled:
+            logger.info("Initializing profiler")
+            profiler = profiling_utils.SamplingProfiler(
+                directory=settings.profiling.directory,
+                duration=settings.profiling.duration,
+                interval=settings.profiling.interval,
+                signal_name=settings.profiling.signal,
             )
 
         logger.info("Initializing lifecycle manager")
 
         lifecycle_manager = lifecycle_manager_utils.LifecycleManager(logger=logger)
         # Startup
+        if ssh_control_masters is not None:
+            lifecycle_manager.add_startup_callback(
+                callback=lifecycle_manager_utils.StartupCallback(
+                    callback=ssh_control_masters.prepare,
+                    error_message="Failed to prepare ssh control directory",
+                    success_message="SSH control directory has been prepared",
+                )
+            )
+        if event_feed is not None:
+            # Started before jobs, so no events are published before subscribers can connect
+            lifecycle_manager.add_startup_callback(
+                callback=lifecycle_manager_utils.StartupCallback(
+                    callback=event_feed.start(),
+                    error_message="Failed to start event feed",
+                    success_message="Event feed has been started",
+                )
+            )
         lifecycle_manager.add_startup_callback(
             callback=lifecycle_manager_utils.StartupCallback(
                 callback=aiojobs_scheduler.spawn_deferred_jobs(),
@@ -70,19 +158,66 @@ class Application:
                 success_message="Deferred jobs have been spawned",
             )
         )
+        if monitor is not None:
+            lifecycle_manager.add_startup_callback(
+                callback=lifecycle_manager_utils.StartupCallback(
+                    callback=monitor.start,
+                    error_message="Failed to start monitor",
+                    success_message="Monitor has been started",
+                )
+            )
+            lifecycle_manager.add_shutdown_callback(
+                callback=lifecycle_manager_utils.ShutdownCallback.from_disposable_resource(
+                    name="monitor",
+                    dispose_callback=monitor.stop(),
+                )
+            )
+
+        if profiler is not None:
+            lifecycle_manager.add_startup_callback(
+                callback=lifecycle_manager_utils.StartupCallback(
+                    callback=profiler.install,
+                    error_message="Failed to install profiler signal handler",
+                    success_message=f"Profiler has been installed, send {settings.profiling.signal} to start profiling",
+                )
+            )
+            lifecycle_manager.add_shutdown_callback(
+                callback=lifecycle_manager_utils.ShutdownCallback.from_disposable_resource(
+                    name="profiler",
+                    dispose_callback=profiler.uninstall,
+                )
+            )
+
         # Shutdown
-        lifecycle_manager.add_shutdown_callback(
-            callback=lifecycle_manager_utils.ShutdownCallback.from_disposable_resource(
-                name="executor",
-                dispose_callback=lambda: executor.shutdown(wait=True),
+        for lane in lanes.values():
+            lifecycle_manager.add_shutdown_callback(
+                callback=lifecycle_manager_utils.ShutdownCallback.from_disposable_resource(
+                    name=f"{lane.name} lane executor",
+                    dispose_callback=functools.partial(lane.executor.shutdown, wait=True),
+                )
+            )
+        if ssh_control_masters is not None:
+            # Stopped after lane executors, so no git process uses masters anymore
+            lifecycle_manager.add_shutdown_callback(
+                callback=lifecycle_manager_utils.ShutdownCallback.from_disposable_resource(
+                    name="ssh control masters",
+                    dispose_callback=ssh_control_masters.close,
+                )
             )
-        )
         lifecycle_manager.add_shutdown_callback(
             callback=lifecycle_manager_utils.ShutdownCallback.from_disposable_resource(
                 name="aiojobs_scheduler",
                 dispose_callback=aiojobs_scheduler.dispose(),
             )
         )
+        if event_feed is not None:
+            # Stopped after lane executors, so events of finishing syncs are still published
+            lifecycle_manager.add_shutdown_callback(
+                callback=lifecycle_manager_utils.ShutdownCallback.from_disposable_resource(
+                    name="event feed",
+                    dispose_callback=event_feed.stop(),
+                )
+            )
 
         logger.info("Creating application")
         application = cls(
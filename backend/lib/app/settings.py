@@ -1,5 +1,7 @@
 import os
 import re
+import signal
+import typing
 import warnings
 
 import pydantic
@@ -10,6 +12,8 @@ import lib.utils.git as git_utils
 import lib.utils.logging as logging_utils
 import lib.utils.pydantic as pydantic_utils
 
+DEFAULT_LANE = "default"
+
 
 class AppSettings(pydantic_settings.BaseSettings):
     env: str = "production"
@@ -32,9 +36,28 @@ class LoggingSettings(pydantic_settings.BaseSettings):
     format: str = "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
 
 
+class LaneSettings(pydantic.BaseModel):
+    max_workers: int
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    @pydantic.field_validator("max_workers")
+    @classmethod
+    def validate_max_workers(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        return value
+
+
 class SchedulerSettings(pydantic_settings.BaseSettings):
     one_time: bool = False
     executor_max_workers: int | None = None
+    lanes: dict[str, LaneSettings] = {}
+    heavy_lane: str | None = None  # None means no automatic lane assignment
+    heavy_duration: int = 5 * 60  # 5 minutes
+    heavy_size: int = 1024 * 1024 * 1024  # 1 GiB
+    stats_path: str | None = None  # None means heavy repos are detected after their first sync in process
     startup_delay: int = 0  # 0 seconds
     success_delay: int = 5 * 60  # 5 minutes
     retry_delay: int = 1 * 60  # 1 minute
@@ -44,6 +67,37 @@ class SchedulerSettings(pydantic_settings.BaseSettings):
     total_timeout: int = 0  # 10 minutes, 0 means no timeout
     close_timeout: int = 10
 
+    @pydantic.model_validator(mode="after")
+    def validate_lanes(self) -> typing.Self:
+        if DEFAULT_LANE in self.lanes:
+            raise ValueError(f"Lane {DEFAULT_LANE!r} is reserved, use executor_max_workers instead")
+        if self.heavy_lane is not None and self.heavy_lane not in self.lanes:
+            raise ValueError(f"Heavy lane {self.heavy_lane!r} is not defined in lanes")
+
+        return self
+
+    @property
+    def executor_workers(self) -> int:
+        if self.executor_max_workers is not None:
+            return self.executor_max_workers
+
+        # Same as concurrent.futures.ThreadPoolExecutor default
+        return min(32, (os.cpu_count() or 1) + 4)
+
+    @property
+    def lane_max_workers(self) -> dict[str, int]:
+        return {
+            DEFAULT_LANE: self.executor_workers,
+            **{name: lane.max_workers for name, lane in self.lanes.items()},
+        }
+
+    @property
+    def sync_stats_store(self) -> git_utils.SyncStatsStore | None:
+        if self.stats_path is None:
+            return None
+
+        return git_utils.SyncStatsStore(path=self.stats_path)
+
     @property
     def aiojobs_scheduler_settings(self) -> aiojobs_utils.Settings:
         return aiojobs_utils.Settings(
@@ -53,23 +107,266 @@ class SchedulerSettings(pydantic_settings.BaseSettings):
         )
 
 
-class RepoSyncSettings(pydantic_settings.BaseSettings):
+class MonitorSettings(pydantic.BaseModel):
+    enabled: bool = False
+    sample_interval: float = 1  # 1 second
+    report_interval: int = 60  # 1 minute
+    loop_lag_warning: float = 0.5  # 0.5 seconds
+    queued_warning: int = 100
+    metrics_path: str | None = None  # None means no metrics file
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+
+class ProfilingSettings(pydantic.BaseModel):
+    enabled: bool = False
+    signal: str = "SIGUSR1"
+    directory: str = "profiles"
+    duration: float = 30  # 30 seconds
+    interval: float = 0.01  # 10 milliseconds
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    @pydantic.field_validator("signal")
+    @classmethod
+    def validate_signal(cls, value: str) -> str:
+        if value not in signal.Signals.__members__:
+            raise ValueError(f"Unknown signal {value!r}")
+        # Handler can't be installed for these
+        if value in ("SIGKILL", "SIGSTOP"):
+            raise ValueError(f"Signal {value!r} can't be handled")
+
+        return value
+
+
+class ResourcesSettings(pydantic.BaseModel):
+    memory_budget: int | None = None  # bytes, None means fraction of available memory
+    memory_budget_fraction: float = 0.8
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    @property
+    def memory_budget_bytes(self) -> int | None:
+        if self.memory_budget is not None:
+            return self.memory_budget
+
+        available_memory = git_utils.get_available_memory()
+        if available_memory is None:
+            return None
+
+        return int(available_memory * self.memory_budget_fraction)
+
+
+# Plain model, nested BaseSettings reads unprefixed environment, e.g. path would be taken from $PATH
+class BundleSettings(pydantic.BaseModel):
+    path: str | None = None  # None means bundle cache is disabled
+    refresh_interval: int = 24 * 60 * 60  # 1 day
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    @property
+    def bundle_cache(self) -> git_utils.BundleCache | None:
+        if self.path is None:
+            return None
+
+        return git_utils.BundleCache(
+            path=self.path,
+            refresh_interval=self.refresh_interval,
+        )
+
+
+class EventFeedSettings(pydantic.BaseModel):
+    file_path: str | None = None  # None means no events file
+    socket_path: str | None = None  # None means no events socket
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    @property
+    def enabled(self) -> bool:
+        return self.file_path is not None or self.socket_path is not None
+
+
+class LfsSettings(pydantic.BaseModel):
+    cache_path: str | None = None  # None means objects are cached during sync only
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    @property
+    def lfs_cache(self) -> git_utils.LfsCache | None:
+        if self.cache_path is None:
+            return None
+
+        return git_utils.LfsCache(path=self.cache_path)
+
+
+class SshSettings(pydantic.BaseModel):
+    multiplexing: bool = False
+    control_dir: str | None = None  # None means temporary directory
+    control_persist: int = 60  # 1 minute
+    command: str | None = None  # None means GIT_SSH_COMMAND environment variable or ssh
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    @property
+    def control_masters(self) -> git_utils.SshControlMasters | None:
+        if not self.multiplexing:
+            return None
+
+        return git_utils.SshControlMasters(
+            control_persist=self.control_persist,
+            control_dir=self.control_dir,
+            command=self.command,
+        )
+
+
+class RepoResourceSettings(pydantic.BaseModel):
+    pack_window_memory: str | None = None
+    pack_threads: int | None = None
+    pack_delta_cache_size: str | None = None
+    isolate: bool = False
+    memory_limit: int | None = None  # bytes
+    cpu_time_limit: int | None = None  # seconds
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    @property
+    def to_dataclass(self) -> git_utils.ResourceLimits:
+        return git_utils.ResourceLimits(
+            pack_window_memory=self.pack_window_memory,
+            pack_threads=self.pack_threads,
+            pack_delta_cache_size=self.pack_delta_cache_size,
+            isolate=self.isolate,
+            memory_limit=self.memory_limit,
+            cpu_time_limit=self.cpu_time_limit,
+        )
+
+
+# Plain model, nested BaseSettings reads environment on every instance and slows down large repos lists
+class RepoSyncSettings(pydantic.BaseModel):
+    template: str | None = None
     source: pydantic_utils.Expanded[str]
     target: pydantic_utils.Expanded[str]
     include_ref: list[str] = []
     include_ref_regex: list[str] = []
     exclude_ref: list[str] = []
     exclude_ref_regex: list[str] = []
+    bundle_export_path: str | None = None
+    push_batch_size: int = 0  # 0 means single mirror push
+    push_max_workers: int = 1
+    push_batch_retries: int = 2
+    priority: float = 1.0
+    lane: str | None = None  # None means default lane with automatic heavy lane assignment
+    lfs: bool = False
+    lfs_source_url: pydantic_utils.Expanded[str] | None = None  # None means derived from source
+    lfs_target_url: pydantic_utils.Expanded[str] | None = None  # None means derived from target
+    lfs_batch_size: int = 100
+    lfs_max_workers: int = 4
+    engine: git_utils.SyncEngineName = "cli"
+    resources: RepoResourceSettings = pydantic.Field(default_factory=RepoResourceSettings)
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    @pydantic.field_validator("include_ref_regex", "exclude_ref_regex")
+    @classmethod
+    def validate_ref_regex(cls, value: list[str]) -> list[str]:
+        # Filters are compiled when jobs are spawned, invalid regex must fail before any job has started
+        for regex in value:
+            try:
+                re.compile(regex)
+            except re.error as error:
+                raise ValueError(f"Invalid regex {regex!r}: {error}") from error
+
+        return value
+
+    @pydantic.field_validator("priority")
+    @classmethod
+    def validate_priority(cls, value: float) -> float:
+        # Zero or negative weight would flatten or reverse staleness order
+        if value <= 0:
+            raise ValueError("priority must be positive")
+
+        return value
+
+    @pydantic.field_validator("push_max_workers")
+    @classmethod
+    def validate_push_max_workers(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError("push_max_workers must be at least 1")
+
+        return value
+
+    @pydantic.model_validator(mode="after")
+    def validate_lfs_urls(self) -> typing.Self:
+        if not self.lfs:
+            return self
+
+        for name, remote_url, lfs_url in [
+            ("source", self.source, self.lfs_source_url),
+            ("target", self.target, self.lfs_target_url),
+        ]:
+            if lfs_url is not None:
+                continue
+            try:
+                git_utils.get_lfs_url(remote_url)
+            except git_utils.LfsError as exc:
+                raise ValueError(f"lfs_{name}_url is required as {name} is not http(s) remote") from exc
+
+        return self
+
+    @pydantic.model_validator(mode="after")
+    def validate_engine(self) -> typing.Self:
+        if self.engine != "dulwich":
+            return self
+
+        unsupported = {
+            "bundle_export_path": self.bundle_export_path is not None,
+            "push_batch_size": self.push_batch_size > 0,
+            "lfs": self.lfs,
+            "resources.pack_*": bool(self.resources.to_dataclass.git_config),
+        }
+        for name, is_set in unsupported.items():
+            if is_set:
+                raise ValueError(f"{name} is not supported by dulwich engine")
+
+        try:
+            git_utils.get_sync_engine(self.engine)
+        except ImportError as exc:
+            raise ValueError(
+                "dulwich engine requires dulwich package, install it with `poetry install --with dulwich`"
+            ) from exc
+
+        return self
 
     @property
     def to_dataclass(self) -> git_utils.SyncRepoTask:
         return git_utils.SyncRepoTask(
             source=self.source,
             target=self.target,
-            include_ref=set(self.include_ref),
-            include_ref_regex=[re.compile(regex) for regex in self.include_ref_regex],
-            exclude_ref=set(self.exclude_ref),
-            exclude_ref_regex=[re.compile(regex) for regex in self.exclude_ref_regex],
+            ref_filter=git_utils.get_ref_filter(
+                include_ref=self.include_ref,
+                include_ref_regex=self.include_ref_regex,
+                exclude_ref=self.exclude_ref,
+                exclude_ref_regex=self.exclude_ref_regex,
+            ),
+            bundle_export_path=self.bundle_export_path,
+            push_batch_size=self.push_batch_size,
+            push_max_workers=self.push_max_workers,
+            push_batch_retries=self.push_batch_retries,
+            resources=self.resources.to_dataclass,
+            lfs=self.lfs_mirroring,
+            engine=self.engine,
+        )
+
+    @property
+    def lfs_mirroring(self) -> git_utils.LfsMirroring | None:
+        if not self.lfs:
+            return None
+
+        return git_utils.LfsMirroring(
+            source_url=self.lfs_source_url,
+            target_url=self.lfs_target_url,
+            batch_size=self.lfs_batch_size,
+            max_workers=self.lfs_max_workers,
         )
 
 
@@ -77,6 +374,15 @@ class Settings(pydantic_settings.BaseSettings):
     app: AppSettings = pydantic.Field(default_factory=AppSettings)
     logs: LoggingSettings = pydantic.Field(default_factory=LoggingSettings)
     scheduler: SchedulerSettings = pydantic.Field(default_factory=SchedulerSettings)
+    monitor: MonitorSettings = pydantic.Field(default_factory=MonitorSettings)
+    profiling: ProfilingSettings = pydantic.Field(default_factory=ProfilingSettings)
+    resources: ResourcesSettings = pydantic.Field(default_factory=ResourcesSettings)
+    bundles: BundleSettings = pydantic.Field(default_factory=BundleSettings)
+    events: EventFeedSettings = pydantic.Field(default_factory=EventFeedSettings)
+    ssh: SshSettings = pydantic.Field(default_factory=SshSettings)
+    lfs: LfsSettings = pydantic.Field(default_factory=LfsSettings)
+    repo_defaults: dict[str, typing.Any] = {}
+    repo_templates: dict[str, dict[str, typing.Any]] = {}
     repos: list[RepoSyncSettings] = []
 
     model_config = pydantic_settings.SettingsConfigDict(
@@ -84,6 +390,48 @@ class Settings(pydantic_settings.BaseSettings):
         env_nested_delimiter="__",
     )
 
+    @pydantic.model_validator(mode="before")
+    @classmethod
+    def apply_repo_templates(cls, data: typing.Any) -> typing.Any:
+        if not isinstance(data, dict):
+            return data
+
+        data = typing.cast(dict[str, typing.Any], data)
+        if "repos" not in data:
+            return data
+
+        defaults = typing.cast(dict[str, typing.Any], data.get("repo_defaults") or {})
+        templates = typing.cast(dict[str, dict[str, typing.Any]], data.get("repo_templates") or {})
+
+        repos: list[typing.Any] = []
+        for repo in typing.cast(list[typing.Any], data["repos"] or []):
+            if isinstance(repo, dict):
+                repo = typing.cast(dict[str, typing.Any], repo)
+                template_name = repo.get("template")
+                if template_name is not None and template_name not in templates:
+                    raise ValueError(f"Template {template_name!r} is not defined in repo_templates")
+                template = templates[template_name] if template_name is not None else {}
+                repo = {**defaults, **template, **repo}
+            repos.append(repo)
+
+        return {**data, "repos": repos}
+
+    @pydantic.model_validator(mode="after")
+    def validate_repo_lanes(self) -> typing.Self:
+        for repo in self.repos:
+            if repo.lane is not None and repo.lane != DEFAULT_LANE and repo.lane not in self.scheduler.lanes:
+                raise ValueError(f"Lane {repo.lane!r} is not defined in scheduler.lanes")
+
+        return self
+
+    @pydantic.model_validator(mode="after")
+    def validate_repo_bundle_exports(self) -> typing.Self:
+        for repo in self.repos:
+            if repo.bundle_export_path is not None and self.bundles.path is None:
+                raise ValueError(f"bundle_export_path of {repo.source!r} requires bundles.path")
+
+        return self
+
     @classmethod
     def settings_customise_sources(
         cls,
@@ -99,8 +447,9 @@ class Settings(pydantic_settings.BaseSettings):
                 raise FileNotFoundError(f"Settings file {settings_file} does not exist")
 
         return (
+            init_settings,
             env_settings,
-            pydantic_settings.YamlConfigSettingsSource(
+            pydantic_utils.YamlConfigSettingsSource(
                 settings_cls,
                 yaml_file=settings_file,
             ),
@@ -109,7 +458,18 @@ class Settings(pydantic_settings.BaseSettings):
 
 __all__ = [
     "AppSettings",
+    "BundleSettings",
+    "DEFAULT_LANE",
+    "EventFeedSettings",
+    "LaneSettings",
+    "LfsSettings",
     "LoggingSettings",
+    "MonitorSettings",
+    "ProfilingSettings",
+    "RepoResourceSettings",
     "RepoSyncSettings",
+    "ResourcesSettings",
+    "SchedulerSettings",
+    "SshSettings",
     "Settings",
 ]
@@ -1,8 +1,10 @@
-import concurrent.futures
+import dataclasses
 import logging
+import time
 import typing
 
 import lib.utils.aiojobs as aiojobs_utils
+import lib.utils.event_feed as event_feed_utils
 import lib.utils.git as git_utils
 import lib.utils.logging as logging_utils
 
@@ -13,7 +15,7 @@ class GitSyncRepoJob(aiojobs_utils.RepeatableJob):
     def __init__(
         self,
         task: git_utils.SyncRepoTask,
-        executor: concurrent.futures.Executor,
+        lane: aiojobs_utils.Lane,
         startup_delay: float,
         success_delay: float,
         retry_delay: float,
@@ -21,13 +23,40 @@ class GitSyncRepoJob(aiojobs_utils.RepeatableJob):
         success_jitter: float,
         retry_jitter: float,
         one_time: bool = False,
+        priority: float = 1.0,
+        bundle_cache: git_utils.BundleCache | None = None,
+        heavy_lane: aiojobs_utils.Lane | None = None,
+        heavy_duration: float = 0,
+        heavy_size: int = 0,
+        sync_stats_store: git_utils.SyncStatsStore | None = None,
+        sync_repo: git_utils.SyncRepoCallable = git_utils.sync_repo,
+        memory_budget: git_utils.MemoryBudget | None = None,
+        event_feed: event_feed_utils.EventFeed | None = None,
+        ssh_multiplexing: git_utils.SshMultiplexing | None = None,
+        lfs_cache: git_utils.LfsCache | None = None,
     ):
+        if event_feed is not None:
+            task = dataclasses.replace(task, track_ref_changes=True)
+        if ssh_multiplexing is not None:
+            task = dataclasses.replace(task, ssh_multiplexing=ssh_multiplexing)
+        if task.lfs is not None and lfs_cache is not None:
+            task = dataclasses.replace(task, lfs_cache=lfs_cache)
         self._task = task
+        self._event_feed = event_feed
+        self._memory_budget = memory_budget
+        self._sync_repo = sync_repo
+        self._heavy_lane = heavy_lane
+        self._heavy_duration = heavy_duration
+        self._heavy_size = heavy_size
+        self._last_size: int | None = None
+        self._sync_stats_store = sync_stats_store
+        self._sync_stats_loaded = False
+        self._bundle_cache = bundle_cache
         self._one_time = one_time
         self._id = self._generate_id()
 
         super().__init__(
-            executor=executor,
+            lane=lane,
             startup_delay=startup_delay,
             success_delay=success_delay,
             retry_delay=retry_delay,
@@ -38,6 +67,7 @@ class GitSyncRepoJob(aiojobs_utils.RepeatableJob):
                 prefix=f"GitSyncRepoJob[{self._id}] ",
                 logger=logging.getLogger(__name__),
             ),
+            priority=priority,
         )
 
     def _generate_id(self) -> int:
@@ -48,12 +78,77 @@ class GitSyncRepoJob(aiojobs_utils.RepeatableJob):
     def name(self) -> str:
         return f"{super().name}[id={self._id}]"
 
+    @property
+    def _is_heavy(self) -> bool:
+        if self._last_duration is not None and self._last_duration >= self._heavy_duration:
+            return True
+        if self._last_size is not None and self._last_size >= self._heavy_size:
+            return True
+        return False
+
+    def _select_lane(self) -> aiojobs_utils.Lane:
+        if self._heavy_lane is None:
+            return self._lane
+
+        self._load_sync_stats()
+        if not self._is_heavy:
+            return self._lane
+
+        self._logger.info("Job is detected as heavy, using %r lane", self._heavy_lane.name)
+        return self._heavy_lane
+
+    def _load_sync_stats(self) -> None:
+        # Stats of previous run let heavy repos start in heavy lane before they are measured again
+        if self._sync_stats_store is None or self._sync_stats_loaded:
+            return
+
+        self._sync_stats_loaded = True
+        stats = self._sync_stats_store.load(source=self._task.source, target=self._task.target, logger=self._logger)
+        if stats is not None and self._last_duration is None:
+            self._last_duration = stats.duration
+            self._last_size = stats.size
+
+    def _save_sync_stats(self, stats: git_utils.SyncStats) -> None:
+        if self._sync_stats_store is None or self._heavy_lane is None:
+            return
+
+        try:
+            self._sync_stats_store.save(source=self._task.source, target=self._task.target, stats=stats)
+        except OSError:
+            self._logger.warning("Failed to save sync stats", exc_info=True)
+
+    def _reserve(self) -> typing.AsyncContextManager[None]:
+        memory_limit = self._task.resources.memory_limit
+        if self._memory_budget is None or memory_limit is None:
+            return super()._reserve()
+
+        return self._memory_budget.reserve(memory_limit)
+
+    def _publish_ref_changes(self, ref_changes: list[git_utils.RefChange]) -> None:
+        if self._event_feed is None or not ref_changes:
+            return
+
+        self._logger.info("Publishing %d ref change(s)", len(ref_changes))
+        # Same as logs, events must not expose secrets, e.g. credentials in source and target URLs
+        event = git_utils.RefChangeEvent(
+            source=logging_utils.mask_secrets(self._task.source),
+            target=logging_utils.mask_secrets(self._task.target),
+            changes=ref_changes,
+        )
+        self._event_feed.publish(event.to_dict())
+
     def _process(self) -> None:
         try:
-            git_utils.sync_repo(
+            started_at = time.monotonic()
+            result = self._sync_repo(
                 task=self._task,
                 logger=self._logger,
+                bundle_cache=self._bundle_cache,
             )
+            duration = time.monotonic() - started_at
+            self._last_size = result.repo_size
+            self._save_sync_stats(git_utils.SyncStats(duration=duration, size=result.repo_size))
+            self._publish_ref_changes(result.ref_changes)
         finally:
             if self._one_time:
                 self._logger.info("Job is set to one-time mode, finishing...")
@@ -0,0 +1,4 @@
+from .engines import *
+from .runner import *
+from .startup import *
+from .stub import *
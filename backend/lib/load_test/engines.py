@@ -0,0 +1,144 @@
+import dataclasses
+import logging
+import os
+import tempfile
+import time
+
+import git
+
+import lib.load_test.runner as runner
+import lib.utils.git as git_utils
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class EngineBenchmarkSettings:
+    repos: int
+    rounds: int
+    branches: int
+    engines: list[git_utils.SyncEngineName] = dataclasses.field(default_factory=lambda: ["cli", "dulwich"])
+
+
+@dataclasses.dataclass
+class EngineBenchmarkResult:
+    engine: git_utils.SyncEngineName
+    sync_times: list[float]
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.sync_times)
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / max(len(self.sync_times), 1)
+
+    def format(self) -> str:
+        percentiles = runner.Percentiles.from_values(self.sync_times)
+        return (
+            f"{self.engine}: syncs={len(self.sync_times)} total={self.total_time:.2f}s "
+            f"mean={self.mean_time * 1000:.1f} {percentiles.format()}"
+        )
+
+
+@dataclasses.dataclass
+class EngineBenchmarkReport:
+    settings: EngineBenchmarkSettings
+    initial: list[EngineBenchmarkResult]
+    incremental: list[EngineBenchmarkResult]
+
+    def format(self) -> str:
+        return "\n".join(
+            [
+                f"Repos: {self.settings.repos}, rounds: {self.settings.rounds}, branches: {self.settings.branches}",
+                "Initial sync, ms:",
+                *(f"\t{result.format()}" for result in self.initial),
+                "Incremental sync, one new commit per round, ms:",
+                *(f"\t{result.format()}" for result in self.incremental),
+            ]
+        )
+
+
+def _commit(repo: git.Repo, branch: str, message: str) -> None:
+    repo.git.checkout("-B", branch)
+    with open(os.path.join(repo.working_dir, f"{branch}.txt"), "a") as file:
+        file.write(f"{message}\n")
+    repo.git.add("--all")
+    repo.git.commit("-m", message)
+
+
+def _create_source(path: str, settings: EngineBenchmarkSettings) -> git.Repo:
+    repo = git.Repo.init(path, initial_branch="main")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Benchmark")
+        config.set_value("user", "email", "benchmark@localhost")
+
+    _commit(repo, branch="main", message="initial")
+    repo.create_tag("v0")
+    for index in range(settings.branches):
+        _commit(repo, branch=f"branch-{index}", message="initial")
+    repo.git.checkout("main")
+
+    return repo
+
+
+def _sync(task: git_utils.SyncRepoTask) -> float:
+    started_at = time.perf_counter()
+    git_utils.sync_repo(task=task, logger=logger)
+    return time.perf_counter() - started_at
+
+
+def run_engine_benchmark(settings: EngineBenchmarkSettings) -> EngineBenchmarkReport:
+    # Fails early when optional engine dependency is not installed
+    for engine in settings.engines:
+        git_utils.get_sync_engine(engine)
+
+    ref_filter = git_utils.get_ref_filter(include_ref=[], include_ref_regex=[], exclude_ref=[], exclude_ref_regex=[])
+    initial = {engine: EngineBenchmarkResult(engine=engine, sync_times=[]) for engine in settings.engines}
+    incremental = {engine: EngineBenchmarkResult(engine=engine, sync_times=[]) for engine in settings.engines}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sources: list[git.Repo] = []
+        tasks: list[dict[git_utils.SyncEngineName, git_utils.SyncRepoTask]] = []
+        for index in range(settings.repos):
+            source_path = os.path.join(temp_dir, f"source-{index}")
+            sources.append(_create_source(source_path, settings))
+
+            engine_tasks: dict[git_utils.SyncEngineName, git_utils.SyncRepoTask] = {}
+            for engine in settings.engines:
+                target_path = os.path.join(temp_dir, f"target-{engine}-{index}.git")
+                git.Repo.init(target_path, bare=True)
+                engine_tasks[engine] = git_utils.SyncRepoTask(
+                    source=f"file://{source_path}",
+                    target=f"file://{target_path}",
+                    ref_filter=ref_filter,
+                    engine=engine,
+                )
+            tasks.append(engine_tasks)
+
+        for engine_tasks in tasks:
+            for engine, task in engine_tasks.items():
+                initial[engine].sync_times.append(_sync(task))
+
+        for round_index in range(settings.rounds):
+            for source, engine_tasks in zip(sources, tasks):
+                _commit(source, branch="main", message=f"round {round_index}")
+                for engine, task in engine_tasks.items():
+                    incremental[engine].sync_times.append(_sync(task))
+
+        for source in sources:
+            source.close()
+
+    return EngineBenchmarkReport(
+        settings=settings,
+        initial=list(initial.values()),
+        incremental=list(incremental.values()),
+    )
+
+
+__all__ = [
+    "EngineBenchmarkReport",
+    "EngineBenchmarkResult",
+    "EngineBenchmarkSettings",
+    "run_engine_benchmark",
+]
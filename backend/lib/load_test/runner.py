@@ -0,0 +1,180 @@
+import asyncio
+import dataclasses
+import time
+import tracemalloc
+
+import lib.app as app
+import lib.load_test.stub as stub
+import lib.utils.asyncio as asyncio_utils
+
+
+@dataclasses.dataclass
+class LoadTestSettings:
+    jobs: int
+    duration: float
+    workers: int
+    latency_mean: float
+    latency_stddev: float
+    failure_rate: float
+    success_delay: int
+    retry_delay: int
+    startup_spread: int
+    lag_interval: float
+    warmup: float
+    seed: int | None = None
+
+
+@dataclasses.dataclass
+class Percentiles:
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    @classmethod
+    def from_values(cls, values: list[float]) -> "Percentiles":
+        if not values:
+            return cls(p50=0.0, p95=0.0, p99=0.0, max=0.0)
+
+        values = sorted(values)
+
+        def percentile(value: float) -> float:
+            return values[min(len(values) - 1, int(len(values) * value))]
+
+        return cls(p50=percentile(0.50), p95=percentile(0.95), p99=percentile(0.99), max=values[-1])
+
+    def format(self, scale: float = 1000.0) -> str:
+        return (
+            f"p50={self.p50 * scale:.1f} p95={self.p95 * scale:.1f} "
+            f"p99={self.p99 * scale:.1f} max={self.max * scale:.1f}"
+        )
+
+
+@dataclasses.dataclass
+class LoadTestReport:
+    settings: LoadTestSettings
+    startup_time: float  # until all jobs are spawned
+    wall_time: float
+    calls: int
+    failures: int
+    loop_lag: Percentiles
+    first_run_lag: Percentiles
+    drift: Percentiles
+    overdue_jobs: int
+    overdue: Percentiles
+    memory_per_job: float  # bytes
+    cpu_time: float
+    worker_utilization: float
+
+    def format(self) -> str:
+        calls = max(self.calls, 1)
+        return "\n".join(
+            [
+                f"Jobs: {self.settings.jobs}, workers: {self.settings.workers}, measured: {self.wall_time:.1f}s",
+                f"Startup: {self.startup_time:.2f}s",
+                f"Sync calls: {self.calls}, failures: {self.failures}",
+                f"Worker utilization: {self.worker_utilization * 100:.1f}%",
+                f"Event loop lag, ms: {self.loop_lag.format()}",
+                f"First run lag, ms: {self.first_run_lag.format()}",
+                f"Scheduling drift, ms: {self.drift.format()}",
+                f"Overdue jobs at the end: {self.overdue_jobs}, ms: {self.overdue.format()}",
+                f"Memory per job: {self.memory_per_job / 1024:.2f} KiB",
+                f"Orchestration CPU: {self.cpu_time / self.wall_time * 100:.1f}% of one core, "
+                f"{self.cpu_time / calls * 1_000_000:.0f} us per sync call",
+            ]
+        )
+
+
+def _create_settings(settings: LoadTestSettings) -> app.Settings:
+    return app.Settings(
+        # Stub failures and zero jitters are logged on every iteration
+        logs=app.LoggingSettings(level="CRITICAL"),
+        scheduler=app.SchedulerSettings(
+            executor_max_workers=settings.workers,
+            startup_delay=settings.startup_spread,
+            startup_jitter=settings.startup_spread,
+            success_delay=settings.success_delay,
+            success_jitter=0,
+            retry_delay=settings.retry_delay,
+            retry_jitter=0,
+        ),
+        repos=[
+            app.RepoSyncSettings(source=f"stub://{index}", target=f"stub://{index}") for index in range(settings.jobs)
+        ],
+    )
+
+
+async def _sample_loop_lag(interval: float, samples: list[float]) -> None:
+    while True:
+        samples.append(await asyncio_utils.measure_loop_lag(interval))
+
+
+async def run(settings: LoadTestSettings) -> LoadTestReport:
+    sync_repo = stub.StubSyncRepo(
+        latency_mean=settings.latency_mean,
+        latency_stddev=settings.latency_stddev,
+        failure_rate=settings.failure_rate,
+        success_delay=settings.success_delay,
+        retry_delay=settings.retry_delay,
+        seed=settings.seed,
+    )
+    application_settings = _create_settings(settings)
+
+    tracemalloc.start()
+    memory_before, _ = tracemalloc.get_traced_memory()
+    started_at = time.monotonic()
+    # Startup delay with equal jitter spreads first iterations over twice the delay
+    sync_repo.first_due_at = started_at + 2 * settings.startup_spread
+
+    application = app.Application.from_settings(application_settings, sync_repo=sync_repo)
+    application_task = asyncio.create_task(application.start())
+    # Every spawned job is an asyncio task
+    while len(asyncio.all_tasks()) <= settings.jobs:
+        await asyncio.sleep(0)
+    startup_time = time.monotonic() - started_at
+    await asyncio.sleep(max(0.0, settings.warmup - startup_time))
+
+    memory_after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    loop_lag: list[float] = []
+    lag_task = asyncio.create_task(_sample_loop_lag(settings.lag_interval, loop_lag))
+    calls_before, failures_before = sync_repo.calls, sync_repo.failures
+    drifts_before = len(sync_repo.drifts)
+    cpu_before, wall_before = time.process_time(), time.monotonic()
+    busy_before = sync_repo.get_busy_time(wall_before)
+
+    await asyncio.sleep(settings.duration)
+
+    cpu_time, wall_after = time.process_time() - cpu_before, time.monotonic()
+    wall_time = wall_after - wall_before
+    busy_time = sync_repo.get_busy_time(wall_after) - busy_before
+    overdue = sync_repo.get_overdue([repo.source for repo in application_settings.repos], wall_after)
+    lag_task.cancel()
+    application_task.cancel()
+    await asyncio.gather(lag_task, application_task, return_exceptions=True)
+    await application.dispose()
+
+    return LoadTestReport(
+        settings=settings,
+        startup_time=startup_time,
+        wall_time=wall_time,
+        calls=sync_repo.calls - calls_before,
+        failures=sync_repo.failures - failures_before,
+        loop_lag=Percentiles.from_values(loop_lag),
+        first_run_lag=Percentiles.from_values(sync_repo.first_run_lags),
+        drift=Percentiles.from_values(sync_repo.drifts[drifts_before:]),
+        overdue_jobs=len(overdue),
+        overdue=Percentiles.from_values(overdue),
+        memory_per_job=(memory_after - memory_before) / max(settings.jobs, 1),
+        cpu_time=cpu_time,
+        worker_utilization=busy_time / (settings.workers * wall_time),
+    )
+
+
+__all__ = [
+    "LoadTestReport",
+    "LoadTestSettings",
+    "Percentiles",
+    "run",
+]
@@ -0,0 +1,121 @@
+import asyncio
+import dataclasses
+import os
+import resource
+import tempfile
+import time
+
+import yaml
+
+import lib.app as app
+import lib.load_test.stub as stub
+
+_ENV_KEY = "GIT_SYNCER_BENCHMARK_USER"
+_SECRET_ENV_KEY = "GIT_SYNCER_BENCHMARK_PASSWORD"
+
+
+@dataclasses.dataclass
+class StartupBenchmarkSettings:
+    repos: int
+    filter_sets: int
+
+
+@dataclasses.dataclass
+class StartupBenchmarkReport:
+    settings: StartupBenchmarkSettings
+    settings_time: float
+    from_settings_time: float
+    spawn_time: float
+    max_rss: int  # bytes
+
+    @property
+    def total_time(self) -> float:
+        return self.settings_time + self.from_settings_time + self.spawn_time
+
+    def format(self) -> str:
+        return "\n".join(
+            [
+                f"Repos: {self.settings.repos}, distinct filter sets: {self.settings.filter_sets}",
+                f"Settings loading and validation: {self.settings_time:.3f}s",
+                f"Application initialization: {self.from_settings_time:.3f}s",
+                f"Jobs spawning: {self.spawn_time:.3f}s",
+                f"Total: {self.total_time:.3f}s, {self.total_time / max(self.settings.repos, 1) * 1_000_000:.0f} us per repo",
+                f"Max RSS: {self.max_rss / 1024 / 1024:.1f} MiB",
+            ]
+        )
+
+
+def _write_settings_file(path: str, settings: StartupBenchmarkSettings) -> None:
+    data = {
+        "logs": {"level": "CRITICAL"},
+        # Jobs should not start syncing during benchmark
+        "scheduler": {"startup_delay": 3600, "startup_jitter": 0},
+        "repo_defaults": {"exclude_ref_regex": ["refs/pull/.*"]},
+        "repo_templates": {
+            f"template-{index}": {"include_ref_regex": [f"refs/heads/release-{index}/.*", "refs/tags/.*"]}
+            for index in range(settings.filter_sets)
+        },
+        "repos": [
+            {
+                "template": f"template-{index % settings.filter_sets}",
+                "source": f'https://{{{{env "{_ENV_KEY}"}}}}:{{{{secret_env "{_SECRET_ENV_KEY}"}}}}@source/{index}.git',
+                "target": f'https://{{{{env "{_ENV_KEY}"}}}}:{{{{secret_env "{_SECRET_ENV_KEY}"}}}}@target/{index}.git',
+            }
+            for index in range(settings.repos)
+        ],
+    }
+    with open(path, "w") as file:
+        yaml.safe_dump(data, file)
+
+
+async def run_startup_benchmark(settings: StartupBenchmarkSettings) -> StartupBenchmarkReport:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        settings_path = os.path.join(temp_dir, "settings.yaml")
+        _write_settings_file(settings_path, settings)
+
+        os.environ["GIT_SYNCER_SETTINGS_YAML"] = settings_path
+        os.environ[_ENV_KEY] = "user"
+        os.environ[_SECRET_ENV_KEY] = "password"
+
+        started_at = time.perf_counter()
+        application_settings = app.Settings()
+        settings_time = time.perf_counter() - started_at
+
+    sync_repo = stub.StubSyncRepo(
+        latency_mean=0,
+        latency_stddev=0,
+        failure_rate=0,
+        success_delay=0,
+        retry_delay=0,
+    )
+    started_at = time.perf_counter()
+    application = app.Application.from_settings(application_settings, sync_repo=sync_repo)
+    from_settings_time = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    application_task = asyncio.create_task(application.start())
+    # Every spawned job is an asyncio task
+    while len(asyncio.all_tasks()) <= settings.repos:
+        await asyncio.sleep(0)
+    spawn_time = time.perf_counter() - started_at
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    application_task.cancel()
+    await asyncio.gather(application_task, return_exceptions=True)
+    await application.dispose()
+
+    return StartupBenchmarkReport(
+        settings=settings,
+        settings_time=settings_time,
+        from_settings_time=from_settings_time,
+        spawn_time=spawn_time,
+        max_rss=max_rss,
+    )
+
+
+__all__ = [
+    "StartupBenchmarkReport",
+    "StartupBenchmarkSettings",
+    "run_startup_benchmark",
+]
@@ -0,0 +1,125 @@
+import dataclasses
+import random
+import threading
+import time
+
+import lib.utils.git as git_utils
+import lib.utils.logging as logging_utils
+
+
+class StubSyncError(Exception): ...
+
+
+@dataclasses.dataclass
+class _RepoState:
+    finished_at: float
+    failed: bool
+
+
+class StubSyncRepo(git_utils.SyncRepoCallable):
+    """
+    Replaces git_utils.sync_repo with sleep of random latency and random failures.
+    Records drift of every iteration start against intended repeat delay,
+    first iterations are measured against first_due_at, the latest intended start of any job.
+    """
+
+    def __init__(
+        self,
+        latency_mean: float,
+        latency_stddev: float,
+        failure_rate: float,
+        success_delay: float,
+        retry_delay: float,
+        seed: int | None = None,
+    ) -> None:
+        self._latency_mean = latency_mean
+        self._latency_stddev = latency_stddev
+        self._failure_rate = failure_rate
+        self._success_delay = success_delay
+        self._retry_delay = retry_delay
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._states: dict[str, _RepoState] = {}
+
+        self._running: dict[str, float] = {}  # source to start time, each source is synced by one job
+        self._busy_time = 0.0
+
+        self.first_due_at: float | None = None  # monotonic time, None means first iterations are not measured
+        self.first_run_lags: list[float] = []
+        self.drifts: list[float] = []
+        self.calls = 0
+        self.failures = 0
+
+    def __call__(
+        self,
+        task: git_utils.SyncRepoTask,
+        logger: logging_utils.AbstractLogger,
+        bundle_cache: git_utils.BundleCache | None = None,
+    ) -> git_utils.SyncRepoResult:
+        started_at = time.monotonic()
+
+        with self._lock:
+            self._running[task.source] = started_at
+            state = self._states.get(task.source)
+            if state is not None:
+                delay = self._retry_delay if state.failed else self._success_delay
+                self.drifts.append(started_at - state.finished_at - delay)
+            elif self.first_due_at is not None:
+                self.first_run_lags.append(max(0.0, started_at - self.first_due_at))
+            latency = max(0.0, self._random.gauss(self._latency_mean, self._latency_stddev))
+            failed = self._random.random() < self._failure_rate
+
+        time.sleep(latency)
+
+        finished_at = time.monotonic()
+        with self._lock:
+            del self._running[task.source]
+            self._states[task.source] = _RepoState(finished_at=finished_at, failed=failed)
+            self.calls += 1
+            self._busy_time += finished_at - started_at
+            if failed:
+                self.failures += 1
+
+        if failed:
+            raise StubSyncError(f"Stub failure of {task.source}")
+
+        return git_utils.SyncRepoResult(repo_size=0)
+
+    def get_busy_time(self, now: float) -> float:
+        """
+        Returns total time spent in calls until now, including elapsed time of running calls.
+        """
+        with self._lock:
+            return self._busy_time + sum(now - started_at for started_at in self._running.values())
+
+    def get_overdue(self, sources: list[str], now: float) -> list[float]:
+        """
+        Returns how long iterations of sources are overdue at now, for sources not started since they became due.
+        Never started sources are overdue since first_due_at.
+        """
+        overdue: list[float] = []
+        with self._lock:
+            for source in sources:
+                if source in self._running:
+                    continue
+
+                state = self._states.get(source)
+                if state is not None:
+                    delay = self._retry_delay if state.failed else self._success_delay
+                    due_at = state.finished_at + delay
+                elif self.first_due_at is not None:
+                    due_at = self.first_due_at
+                else:
+                    continue
+
+                if now > due_at:
+                    overdue.append(now - due_at)
+
+        return overdue
+
+
+__all__ = [
+    "StubSyncError",
+    "StubSyncRepo",
+]
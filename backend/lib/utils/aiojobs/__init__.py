@@ -1,2 +1,5 @@
+from .dispatcher import *
 from .jobs import *
+from .lanes import *
+from .monitor import *
 from .scheduler import *
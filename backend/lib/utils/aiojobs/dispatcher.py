@@ -0,0 +1,101 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import typing
+
+_Waiter = tuple[float, int, asyncio.Future[None]]  # last success time, arrival order, future
+
+
+class PriorityDispatcher:
+    """
+    Limits number of concurrently running jobs, released slot is given to the most stale waiting job.
+    Staleness is time since last success multiplied by priority, evaluated at release time.
+    Waiters are kept in a heap per priority, within which staleness order never changes,
+    so release compares one waiter per distinct priority.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self._max_workers = max_workers
+        self._active_count = 0
+        self._queues: dict[float, list[_Waiter]] = {}
+        self._counter = itertools.count()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def active_count(self) -> int:
+        return self._active_count
+
+    @property
+    def queued_count(self) -> int:
+        return sum(1 for queue in self._queues.values() for _, _, future in queue if not future.done())
+
+    @contextlib.asynccontextmanager
+    async def slot(self, last_success_at: float, priority: float = 1.0) -> typing.AsyncIterator[None]:
+        """
+        :param last_success_at: event loop time of last success of the job
+        :param priority: staleness weight, must be positive
+        """
+        await self._acquire(last_success_at=last_success_at, priority=priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, last_success_at: float, priority: float) -> None:
+        self._discard_done_waiters()
+        if self._active_count < self._max_workers and not self._queues:
+            self._active_count += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queues.setdefault(priority, []), (last_success_at, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot has already been handed over, pass it to the next waiter
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._discard_done_waiters()
+        if not self._queues:
+            self._active_count -= 1
+            return
+
+        now = asyncio.get_running_loop().time()
+        # Equally stale waiters are admitted in arrival order
+        _, _, priority = max(
+            (get_weighted_staleness(queue[0][0], now=now, priority=priority), -queue[0][1], priority)
+            for priority, queue in self._queues.items()
+        )
+        queue = self._queues[priority]
+        _, _, future = heapq.heappop(queue)
+        if not queue:
+            del self._queues[priority]
+        future.set_result(None)
+
+    def _discard_done_waiters(self) -> None:
+        # Cancelled waiters are left in queues and dropped once they reach the top
+        for priority, queue in list(self._queues.items()):
+            while queue and queue[0][2].done():
+                heapq.heappop(queue)
+            if not queue:
+                del self._queues[priority]
+
+
+def get_weighted_staleness(last_success_at: float, now: float, priority: float) -> float:
+    """
+    Returns time since last success multiplied by priority, higher value means more stale job.
+    """
+    return (now - last_success_at) * priority
+
+
+__all__ = [
+    "PriorityDispatcher",
+    "get_weighted_staleness",
+]
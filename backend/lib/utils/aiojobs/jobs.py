@@ -1,10 +1,11 @@
 import abc
 import asyncio
-import concurrent.futures
+import contextlib
 import logging
 import random
 import typing
 
+import lib.utils.aiojobs.lanes as utils_aiojobs_lanes
 import lib.utils.logging as logging_utils
 
 logger = logging.getLogger(__name__)
@@ -47,7 +48,7 @@ async def _sleep_with_jitter(delay: float, jitter: float) -> None:
 class RepeatableJob(JobBase):
     def __init__(
         self,
-        executor: concurrent.futures.Executor,
+        lane: utils_aiojobs_lanes.Lane,
         success_delay: float,
         retry_delay: float,
         startup_delay: float,
@@ -55,8 +56,10 @@ class RepeatableJob(JobBase):
         success_jitter: float,
         retry_jitter: float,
         logger: logging_utils.AbstractLogger,
+        priority: float = 1.0,
     ) -> None:
-        self._executor = executor
+        self._lane = lane
+        self._priority = priority
 
         self._startup_delay = startup_delay
         self._success_delay = success_delay
@@ -69,17 +72,35 @@ class RepeatableJob(JobBase):
         self._logger = logger
 
         self._finished = False
+        self._last_success_at = 0.0
+        self._last_duration: float | None = None
 
     async def process(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Staleness of never succeeded job is counted from its start
+        self._last_success_at = loop.time()
+
         await _sleep_with_jitter(self._startup_delay, self._startup_jitter)
 
         while True:
-            loop = asyncio.get_running_loop()
+            lane = self._select_lane()
             try:
-                await loop.run_in_executor(
-                    executor=self._executor,
-                    func=self._process,
-                )
+                # Resources are reserved before worker slot, so waiting job doesn't hold the worker
+                async with (
+                    self._reserve(),
+                    lane.dispatcher.slot(
+                        last_success_at=self._last_success_at,
+                        priority=self._priority,
+                    ),
+                ):
+                    started_at = loop.time()
+                    try:
+                        await loop.run_in_executor(
+                            executor=lane.executor,
+                            func=self._process,
+                        )
+                    finally:
+                        self._last_duration = loop.time() - started_at
             except asyncio.CancelledError:
                 self._logger.info("Job %r has been cancelled", self.name)
                 return
@@ -95,6 +116,7 @@ class RepeatableJob(JobBase):
                     return
                 await _sleep_with_jitter(self._retry_delay, self._retry_jitter)
             else:
+                self._last_success_at = loop.time()
                 if self._finished:
                     self._logger.info("Job %r has been finished", self.name)
                     return
@@ -106,6 +128,12 @@ class RepeatableJob(JobBase):
                 )
                 await _sleep_with_jitter(self._success_delay, self._success_jitter)
 
+    def _select_lane(self) -> utils_aiojobs_lanes.Lane:
+        return self._lane
+
+    def _reserve(self) -> typing.AsyncContextManager[None]:
+        return contextlib.nullcontext()
+
     def finish(self) -> None:
         self._finished = True
 
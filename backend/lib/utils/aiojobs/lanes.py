@@ -0,0 +1,27 @@
+import concurrent.futures
+import dataclasses
+
+import lib.utils.aiojobs.dispatcher as utils_aiojobs_dispatcher
+
+
+@dataclasses.dataclass
+class Lane:
+    name: str
+    executor: concurrent.futures.Executor
+    dispatcher: utils_aiojobs_dispatcher.PriorityDispatcher
+
+    @classmethod
+    def from_max_workers(cls, name: str, max_workers: int) -> "Lane":
+        return cls(
+            name=name,
+            executor=concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=f"lane-{name}",
+            ),
+            dispatcher=utils_aiojobs_dispatcher.PriorityDispatcher(max_workers=max_workers),
+        )
+
+
+__all__ = [
+    "Lane",
+]
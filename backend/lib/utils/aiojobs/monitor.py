@@ -0,0 +1,139 @@
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+
+import lib.utils.aiojobs.lanes as utils_aiojobs_lanes
+import lib.utils.asyncio as asyncio_utils
+import lib.utils.logging as logging_utils
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class LaneSample:
+    name: str
+    max_workers: int
+    active: int
+    queued: int
+
+
+@dataclasses.dataclass
+class MonitorSample:
+    loop_lag: float  # maximum lag during report interval, seconds
+    running_jobs: int  # jobs holding lane workers, idle repeatable jobs waiting for next run are not counted
+    lanes: list[LaneSample]
+
+
+class Monitor:
+    def __init__(
+        self,
+        lanes: list[utils_aiojobs_lanes.Lane],
+        sample_interval: float,
+        report_interval: float,
+        loop_lag_warning: float,
+        queued_warning: int,
+        metrics_path: str | None = None,
+        metrics_prefix: str = "aiojobs",
+        logger: logging_utils.AbstractLogger = logger,
+    ) -> None:
+        self._lanes = lanes
+        self._sample_interval = sample_interval
+        self._report_interval = report_interval
+        self._loop_lag_warning = loop_lag_warning
+        self._queued_warning = queued_warning
+        self._metrics_path = metrics_path
+        self._metrics_prefix = metrics_prefix
+        self._logger = logger
+
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            loop_lag = 0.0
+            deadline = loop.time() + self._report_interval
+            while loop.time() < deadline:
+                loop_lag = max(loop_lag, await asyncio_utils.measure_loop_lag(self._sample_interval))
+
+            try:
+                self._report(self._collect(loop_lag))
+            except Exception:
+                self._logger.exception("Failed to report monitor sample")
+
+    def _collect(self, loop_lag: float) -> MonitorSample:
+        lanes = [
+            LaneSample(
+                name=lane.name,
+                max_workers=lane.dispatcher.max_workers,
+                active=lane.dispatcher.active_count,
+                queued=lane.dispatcher.queued_count,
+            )
+            for lane in self._lanes
+        ]
+        # Scheduler counts repeatable jobs between runs too, so running jobs are counted by lanes
+        return MonitorSample(loop_lag=loop_lag, running_jobs=sum(lane.active for lane in lanes), lanes=lanes)
+
+    def _report(self, sample: MonitorSample) -> None:
+        data = dataclasses.asdict(sample)
+        self._logger.info("Monitor sample: %s", json.dumps(data), extra={"monitor": data})
+
+        if sample.loop_lag >= self._loop_lag_warning:
+            self._logger.warning(
+                "Event loop lag %.3f seconds exceeds %.3f seconds, event loop is blocked",
+                sample.loop_lag,
+                self._loop_lag_warning,
+            )
+        for lane in sample.lanes:
+            if lane.queued >= self._queued_warning:
+                self._logger.warning(
+                    "Lane %r has %d queued jobs with %d/%d workers busy, executor is saturated",
+                    lane.name,
+                    lane.queued,
+                    lane.active,
+                    lane.max_workers,
+                )
+
+        if self._metrics_path is not None:
+            self._write_metrics(sample)
+
+    def _write_metrics(self, sample: MonitorSample) -> None:
+        assert self._metrics_path is not None
+        prefix = self._metrics_prefix
+        lines = [
+            f"{prefix}_loop_lag_seconds {sample.loop_lag}",
+            f"{prefix}_running_jobs {sample.running_jobs}",
+        ]
+        for lane in sample.lanes:
+            labels = f'{{lane="{lane.name}"}}'
+            lines.append(f"{prefix}_lane_max_workers{labels} {lane.max_workers}")
+            lines.append(f"{prefix}_lane_active{labels} {lane.active}")
+            lines.append(f"{prefix}_lane_queued{labels} {lane.queued}")
+
+        # Written atomically to be consumed by Prometheus node exporter textfile collector
+        temp_path = f"{self._metrics_path}.tmp"
+        with open(temp_path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(temp_path, self._metrics_path)
+
+
+__all__ = [
+    "LaneSample",
+    "Monitor",
+    "MonitorSample",
+]
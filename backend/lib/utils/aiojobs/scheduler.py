@@ -42,6 +42,7 @@ class Scheduler(SchedulerProtocol):
     def __init__(self, aiojobs_scheduler: AioJobsScheduler) -> None:
         self._aiojobs_scheduler = aiojobs_scheduler
         self._prepared_jobs: list[utils_aiojobs_jobs.JobProtocol] = []
+        self._lazy_jobs: list[typing.Iterable[utils_aiojobs_jobs.JobProtocol]] = []
 
     @classmethod
     def from_settings(cls, settings: Settings) -> typing.Self:
@@ -64,6 +65,12 @@ class Scheduler(SchedulerProtocol):
     def defer_jobs(self, *jobs: utils_aiojobs_jobs.JobProtocol) -> None:
         self._prepared_jobs.extend(jobs)
 
+    def defer_lazy_jobs(self, jobs: typing.Iterable[utils_aiojobs_jobs.JobProtocol]) -> None:
+        """
+        Jobs are created from iterable only when spawned.
+        """
+        self._lazy_jobs.append(jobs)
+
     async def spawn_deferred_jobs(self) -> None:
         logger.info("Prepared jobs are starting")
 
@@ -71,6 +78,10 @@ class Scheduler(SchedulerProtocol):
             job = self._prepared_jobs.pop()
             await self.spawn_job(job)
 
+        while self._lazy_jobs:
+            for job in self._lazy_jobs.pop():
+                await self.spawn_job(job)
+
         logger.info("Prepared jobs were successfully started")
 
     async def spawn_job(self, job: utils_aiojobs_jobs.JobProtocol) -> None:
@@ -90,6 +101,10 @@ class Scheduler(SchedulerProtocol):
     def is_empty(self) -> bool:
         return len(self._aiojobs_scheduler) == 0
 
+    @property
+    def active_count(self) -> int:
+        return self._aiojobs_scheduler.active_count
+
 
 __all__ = [
     "Scheduler",
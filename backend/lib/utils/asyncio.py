@@ -14,6 +14,15 @@ class TimeoutTimer:
         return asyncio.get_event_loop().time() > self._deadline
 
 
+async def measure_loop_lag(interval: float) -> float:
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+    await asyncio.sleep(interval)
+
+    return max(0.0, loop.time() - started_at - interval)
+
+
 __all__ = [
     "TimeoutTimer",
+    "measure_loop_lag",
 ]
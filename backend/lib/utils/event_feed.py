@@ -0,0 +1,107 @@
+import asyncio
+import json
+import logging
+import os
+import stat
+import threading
+import typing
+
+import lib.utils.logging as logging_utils
+
+logger = logging.getLogger(__name__)
+
+
+class EventFeed:
+    """
+    Publishes events as JSON lines to append-only file and to subscribers connected to unix socket.
+    Publishing is thread-safe, socket subscribers receive only events published after they have connected.
+    """
+
+    def __init__(
+        self,
+        file_path: str | None = None,
+        socket_path: str | None = None,
+        max_buffer_size: int = 1024 * 1024,  # 1 MiB
+        logger: logging_utils.AbstractLogger = logger,
+    ) -> None:
+        self._file_path = file_path
+        self._socket_path = socket_path
+        self._max_buffer_size = max_buffer_size
+        self._logger = logger
+
+        self._file_lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.Server | None = None
+        self._subscribers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+        if self._file_path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(self._file_path)), exist_ok=True)
+
+        if self._socket_path is not None:
+            self._remove_stale_socket()
+            os.makedirs(os.path.dirname(os.path.abspath(self._socket_path)), exist_ok=True)
+            self._server = await asyncio.start_unix_server(self._handle_subscriber, path=self._socket_path)
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+
+        self._server.close()
+        for writer in list(self._subscribers):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+        self._remove_stale_socket()
+
+    def publish(self, event: dict[str, typing.Any]) -> None:
+        line = json.dumps(event) + "\n"
+
+        if self._file_path is not None:
+            with self._file_lock, open(self._file_path, "a") as file:
+                file.write(line)
+
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._broadcast, line.encode())
+
+    def _remove_stale_socket(self) -> None:
+        assert self._socket_path is not None
+        try:
+            if stat.S_ISSOCK(os.stat(self._socket_path).st_mode):
+                os.remove(self._socket_path)
+        except FileNotFoundError:
+            pass
+
+    async def _handle_subscriber(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._subscribers.add(writer)
+        self._logger.info("Event feed subscriber has connected, %d subscriber(s)", len(self._subscribers))
+        try:
+            # Subscribers are not expected to send anything, reading only detects disconnection
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self._subscribers.discard(writer)
+            writer.close()
+            self._logger.info("Event feed subscriber has disconnected, %d subscriber(s)", len(self._subscribers))
+
+    def _broadcast(self, data: bytes) -> None:
+        for writer in list(self._subscribers):
+            if writer.transport.get_write_buffer_size() > self._max_buffer_size:
+                self._logger.warning("Event feed subscriber is too slow, disconnecting")
+                self._subscribers.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+
+
+__all__ = [
+    "EventFeed",
+]
@@ -1 +1,9 @@
+from .bundle import *
+from .events import *
+from .filters import *
+from .lfs import *
+from .push import *
+from .resources import *
+from .ssh import *
+from .stats import *
 from .sync import *
@@ -0,0 +1,56 @@
+import dataclasses
+import hashlib
+import os
+import shutil
+import time
+
+import git
+
+
+@dataclasses.dataclass
+class BundleCache:
+    path: str
+    refresh_interval: float
+
+    def get_bundle_path(self, source: str, target: str) -> str:
+        key = hashlib.sha256(f"{source}\n{target}".encode()).hexdigest()
+        return os.path.join(self.path, f"{key}.bundle")
+
+    def is_stale(self, bundle_path: str) -> bool:
+        try:
+            modified_at = os.path.getmtime(bundle_path)
+        except FileNotFoundError:
+            return True
+
+        return time.time() - modified_at >= self.refresh_interval
+
+
+def write_bundle(repo: git.Repo, bundle_path: str) -> None:
+    os.makedirs(os.path.dirname(bundle_path) or ".", exist_ok=True)
+
+    temp_path = f"{bundle_path}.tmp"
+    try:
+        repo.git.bundle("create", temp_path, "--all")
+        os.replace(temp_path, bundle_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def export_bundle(bundle_path: str, export_path: str) -> None:
+    os.makedirs(os.path.dirname(export_path) or ".", exist_ok=True)
+
+    temp_path = f"{export_path}.tmp"
+    try:
+        shutil.copyfile(bundle_path, temp_path)
+        os.replace(temp_path, export_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+__all__ = [
+    "BundleCache",
+    "export_bundle",
+    "write_bundle",
+]
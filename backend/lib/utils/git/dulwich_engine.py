@@ -0,0 +1,139 @@
+import os
+import tempfile
+import typing
+
+import dulwich.client
+import dulwich.objects
+import dulwich.refs
+import dulwich.repo
+
+import lib.utils.git.bundle as bundle_utils
+import lib.utils.git.events as events_utils
+import lib.utils.git.sync as sync_utils
+import lib.utils.logging as logging_utils
+
+
+class DulwichPushError(Exception):
+    def __init__(self, ref_errors: dict[str, str]) -> None:
+        super().__init__(f"Failed to push {len(ref_errors)} ref(s): {ref_errors}")
+        self.ref_errors = ref_errors
+
+
+def _get_refs(refs: typing.Mapping[dulwich.refs.Ref, dulwich.objects.ObjectID | None]) -> dict[str, str]:
+    # HEAD and peeled tags are not refs to mirror
+    return {
+        ref.decode(): sha.decode()
+        for ref, sha in refs.items()
+        if sha is not None and ref.startswith(b"refs/") and not ref.endswith(b"^{}")
+    }
+
+
+class DulwichSyncEngine(sync_utils.SyncEngine):
+    """
+    Talks git protocol in process with dulwich, no git process is spawned, ssh remotes still spawn ssh.
+    Only included refs are fetched, objects are stored in temporary bare repo as by CLI engine.
+    Bundle cache, LFS, batched push and git config of resources are not supported.
+    """
+
+    def sync(
+        self,
+        task: sync_utils.SyncRepoTask,
+        logger: logging_utils.AbstractLogger,
+        bundle_cache: bundle_utils.BundleCache | None = None,
+    ) -> sync_utils.SyncRepoResult:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_path = os.path.join(temp_dir, "repo.git")
+            repo = dulwich.repo.Repo.init_bare(repo_path, mkdir=True)
+            try:
+                source_refs = self._fetch(task=task, repo=repo, logger=logger)
+                ref_changes = self._push(task=task, repo=repo, source_refs=source_refs, logger=logger)
+            finally:
+                repo.close()
+
+            if not task.track_ref_changes:
+                ref_changes = []
+
+            return sync_utils.SyncRepoResult(
+                repo_size=sync_utils.get_directory_size(repo_path),
+                ref_changes=ref_changes,
+            )
+
+    def _get_client(self, task: sync_utils.SyncRepoTask, url: str) -> tuple[dulwich.client.GitClient, str]:
+        return dulwich.client.get_transport_and_path(url, ssh_command=task.git_env.get("GIT_SSH_COMMAND"))
+
+    def _fetch(
+        self,
+        task: sync_utils.SyncRepoTask,
+        repo: dulwich.repo.Repo,
+        logger: logging_utils.AbstractLogger,
+    ) -> dict[str, str]:
+        client, path = self._get_client(task=task, url=task.source)
+        included_refs: dict[str, str] = {}
+
+        def determine_wants(
+            refs: typing.Mapping[dulwich.refs.Ref, dulwich.objects.ObjectID],
+            depth: int | None = None,
+        ) -> list[dulwich.objects.ObjectID]:
+            for ref, sha in _get_refs(refs).items():
+                if task.ref_filter.is_included(ref):
+                    included_refs[ref] = sha
+
+            return [dulwich.objects.ObjectID(sha.encode()) for sha in set(included_refs.values())]
+
+        logger.info("Fetching from %s", task.source)
+        result = client.fetch(path, repo, determine_wants=determine_wants)
+
+        logger.info("Fetched refs:")
+        for ref in _get_refs(result.refs):
+            logger.info("\t%s", ref)
+
+        logger.info("Skipped excluded refs:")
+        for ref in _get_refs(result.refs):
+            if ref not in included_refs:
+                logger.info("\t%s", ref)
+
+        return included_refs
+
+    def _push(
+        self,
+        task: sync_utils.SyncRepoTask,
+        repo: dulwich.repo.Repo,
+        source_refs: dict[str, str],
+        logger: logging_utils.AbstractLogger,
+    ) -> list[events_utils.RefChange]:
+        client, path = self._get_client(task=task, url=task.target)
+        ref_changes: list[events_utils.RefChange] = []
+
+        def update_refs(
+            refs: dict[dulwich.refs.Ref, dulwich.objects.ObjectID],
+        ) -> dict[dulwich.refs.Ref, dulwich.objects.ObjectID]:
+            ref_changes[:] = events_utils.get_ref_changes(old_refs=_get_refs(refs), new_refs=source_refs)
+
+            # Same as git push --mirror, refs missing in source are deleted, refs not returned are left as is
+            new_refs: dict[dulwich.refs.Ref, dulwich.objects.ObjectID] = {}
+            for change in ref_changes:
+                new_sha = dulwich.objects.ZERO_SHA
+                if change.new_sha is not None:
+                    new_sha = dulwich.objects.ObjectID(change.new_sha.encode())
+                new_refs[dulwich.refs.Ref(change.ref.encode())] = new_sha
+
+            return new_refs
+
+        logger.info("Pushing to %s", task.target)
+        result = client.send_pack(path.encode(), update_refs, generate_pack_data=repo.object_store.generate_pack_data)
+
+        logger.info("Pushed refs:")
+        for change in ref_changes:
+            logger.info("\t%s %s..%s", change.ref, change.old_sha, change.new_sha)
+
+        ref_errors = {ref.decode(): error for ref, error in (result.ref_status or {}).items() if error is not None}
+        if ref_errors:
+            raise DulwichPushError(ref_errors=ref_errors)
+
+        return ref_changes
+
+
+__all__ = [
+    "DulwichPushError",
+    "DulwichSyncEngine",
+]
@@ -0,0 +1,57 @@
+import dataclasses
+import datetime
+import typing
+
+RefChangeType = typing.Literal["created", "updated", "deleted"]
+
+
+@dataclasses.dataclass(frozen=True)
+class RefChange:
+    ref: str
+    old_sha: str | None  # None when ref has been created
+    new_sha: str | None  # None when ref has been deleted
+    type: RefChangeType
+
+
+@dataclasses.dataclass
+class RefChangeEvent:
+    source: str
+    target: str
+    changes: list[RefChange]
+    timestamp: datetime.datetime = dataclasses.field(default_factory=lambda: datetime.datetime.now(datetime.UTC))
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "source": self.source,
+            "target": self.target,
+            "changes": [dataclasses.asdict(change) for change in self.changes],
+        }
+
+
+def get_ref_changes(old_refs: dict[str, str], new_refs: dict[str, str]) -> list[RefChange]:
+    """
+    Returns changes turning old_refs into new_refs, old_refs and new_refs map ref names to SHAs.
+    """
+    changes: list[RefChange] = []
+
+    for ref, new_sha in sorted(new_refs.items()):
+        old_sha = old_refs.get(ref)
+        if old_sha is None:
+            changes.append(RefChange(ref=ref, old_sha=None, new_sha=new_sha, type="created"))
+        elif old_sha != new_sha:
+            changes.append(RefChange(ref=ref, old_sha=old_sha, new_sha=new_sha, type="updated"))
+
+    for ref, old_sha in sorted(old_refs.items()):
+        if ref not in new_refs:
+            changes.append(RefChange(ref=ref, old_sha=old_sha, new_sha=None, type="deleted"))
+
+    return changes
+
+
+__all__ = [
+    "RefChange",
+    "RefChangeEvent",
+    "RefChangeType",
+    "get_ref_changes",
+]
@@ -0,0 +1,69 @@
+import dataclasses
+import functools
+import re
+
+
+@dataclasses.dataclass(frozen=True)
+class RefFilter:
+    include_ref: frozenset[str]
+    include_ref_regex: tuple[re.Pattern[str], ...]
+    exclude_ref: frozenset[str]
+    exclude_ref_regex: tuple[re.Pattern[str], ...]
+
+    def is_included(self, ref_path: str) -> bool:
+        if ref_path in self.exclude_ref:
+            return False
+
+        for regex in self.exclude_ref_regex:
+            if regex.match(ref_path):
+                return False
+
+        if ref_path in self.include_ref:
+            return True
+
+        for regex in self.include_ref_regex:
+            if regex.match(ref_path):
+                return True
+
+        if not self.include_ref and not self.include_ref_regex:
+            return True
+
+        return False
+
+
+@functools.cache
+def _get_ref_filter(
+    include_ref: frozenset[str],
+    include_ref_regex: tuple[str, ...],
+    exclude_ref: frozenset[str],
+    exclude_ref_regex: tuple[str, ...],
+) -> RefFilter:
+    return RefFilter(
+        include_ref=include_ref,
+        include_ref_regex=tuple(re.compile(regex) for regex in include_ref_regex),
+        exclude_ref=exclude_ref,
+        exclude_ref_regex=tuple(re.compile(regex) for regex in exclude_ref_regex),
+    )
+
+
+def get_ref_filter(
+    include_ref: list[str],
+    include_ref_regex: list[str],
+    exclude_ref: list[str],
+    exclude_ref_regex: list[str],
+) -> RefFilter:
+    """
+    Returns shared filter instance for identical rules, so regexes are compiled once per distinct rules.
+    """
+    return _get_ref_filter(
+        include_ref=frozenset(include_ref),
+        include_ref_regex=tuple(include_ref_regex),
+        exclude_ref=frozenset(exclude_ref),
+        exclude_ref_regex=tuple(exclude_ref_regex),
+    )
+
+
+__all__ = [
+    "RefFilter",
+    "get_ref_filter",
+]
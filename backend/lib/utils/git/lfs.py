@@ -0,0 +1,359 @@
+import base64
+import concurrent.futures
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import typing
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import git
+
+import lib.utils.logging as logging_utils
+
+_POINTER_MAX_SIZE = 1024  # same limit as git-lfs uses to detect pointer blobs
+_POINTER_PATTERN = re.compile(
+    rb"version https://git-lfs\.github\.com/spec/v1\noid sha256:([0-9a-f]{64})\nsize ([0-9]+)\n",
+)
+_MEDIA_TYPE = "application/vnd.git-lfs+json"
+_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+# Serializes downloads of the same object by concurrent syncs, striped to keep number of locks bounded
+_DOWNLOAD_LOCKS = [threading.Lock() for _ in range(64)]
+
+
+class LfsError(Exception): ...
+
+
+@dataclasses.dataclass(frozen=True)
+class LfsPointer:
+    oid: str  # sha256 of object content
+    size: int  # bytes
+
+
+@dataclasses.dataclass(frozen=True)
+class LfsMirroring:
+    source_url: str | None = None  # None means derived from source repo url
+    target_url: str | None = None  # None means derived from target repo url
+    batch_size: int = 100
+    max_workers: int = 4
+    timeout: float = 60  # seconds, per request
+
+
+@dataclasses.dataclass(frozen=True)
+class LfsCache:
+    """
+    Content-addressed store of LFS objects, same layout as .git/lfs/objects, shared by all syncs.
+    """
+
+    path: str
+
+    def get_object_path(self, oid: str) -> str:
+        return os.path.join(self.path, oid[0:2], oid[2:4], oid)
+
+    def has_object(self, pointer: LfsPointer) -> bool:
+        try:
+            return os.path.getsize(self.get_object_path(pointer.oid)) == pointer.size
+        except OSError:
+            return False
+
+    def get_mirrored_commits_path(self, source: str, target: str) -> str:
+        key = hashlib.sha256(f"{source}\n{target}".encode()).hexdigest()
+        return os.path.join(self.path, "mirrored", f"{key}.json")
+
+    def load_mirrored_commits(self, source: str, target: str) -> list[str]:
+        """
+        Returns commits whose LFS objects have been mirrored to target, empty list means full scan is needed.
+        """
+        try:
+            with open(self.get_mirrored_commits_path(source=source, target=target)) as file:
+                commits = json.load(file)
+        except (OSError, ValueError):
+            return []
+
+        if not isinstance(commits, list):
+            return []
+        return [commit for commit in typing.cast(list[typing.Any], commits) if isinstance(commit, str)]
+
+    def save_mirrored_commits(self, source: str, target: str, commits: list[str]) -> None:
+        path = self.get_mirrored_commits_path(source=source, target=target)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w") as file:
+                json.dump(commits, file)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def parse_lfs_pointer(data: bytes) -> LfsPointer | None:
+    match = _POINTER_PATTERN.match(data)
+    if match is None:
+        return None
+
+    return LfsPointer(oid=match.group(1).decode(), size=int(match.group(2)))
+
+
+def _get_existing_objects(repo: git.Repo, shas: typing.Collection[str], temp_dir: str) -> list[str]:
+    input_path = os.path.join(temp_dir, "objects")
+    with open(input_path, "w") as file:
+        file.writelines(f"{sha}\n" for sha in shas)
+    with open(input_path) as file:
+        output = typing.cast(str, repo.git.cat_file("--batch-check=%(objectname) %(objecttype)", istream=file))
+
+    return [line.split(" ", 1)[0] for line in output.splitlines() if not line.endswith(" missing")]
+
+
+def get_lfs_pointers(repo: git.Repo, exclude_commits: typing.Collection[str] = ()) -> list[LfsPointer]:
+    """
+    Returns LFS pointers reachable from all refs of repo, blobs too large to be pointers are not read.
+    Every small blob of the scanned history is read, so exclude_commits whose objects are known to be mirrored.
+
+    :param exclude_commits: objects reachable from these commits are skipped, commits missing in repo are ignored
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # rev-list fails on missing objects, e.g. commits of deleted branches
+        existing = _get_existing_objects(repo, exclude_commits, temp_dir=temp_dir) if exclude_commits else []
+        # Excluded commits are passed through stdin, there can be too many for command line
+        input_path = os.path.join(temp_dir, "exclude")
+        with open(input_path, "w") as file:
+            file.writelines(f"^{sha}\n" for sha in existing)
+
+        with open(input_path) as file:
+            rev_list = repo.git.rev_list(
+                "--objects",
+                "--all",
+                "--stdin",
+                f"--filter=blob:limit={_POINTER_MAX_SIZE}",
+                istream=file,
+                as_process=True,
+            )
+            # %(rest) makes cat-file ignore object paths printed by rev-list
+            output = typing.cast(
+                str,
+                repo.git.cat_file("--batch-check=%(objectname) %(objecttype) %(rest)", istream=rev_list.proc.stdout),
+            )
+            rev_list.wait()
+
+    pointers: dict[str, LfsPointer] = {}
+    for line in output.splitlines():
+        sha, object_type = line.split(" ", 2)[:2]
+        if object_type != "blob":
+            continue
+
+        _, _, _, data = repo.git.get_object_data(sha)
+        pointer = parse_lfs_pointer(data)
+        if pointer is not None:
+            pointers[pointer.oid] = pointer
+
+    return sorted(pointers.values(), key=lambda pointer: pointer.oid)
+
+
+def get_lfs_url(remote_url: str) -> str:
+    """
+    Returns LFS server url of http(s) remote by git-lfs rules, e.g. https://host/repo.git/info/lfs.
+
+    :raises LfsError when remote is not http(s), LFS over ssh is not supported.
+    """
+    parsed = urllib.parse.urlsplit(remote_url)
+    if parsed.scheme not in ("http", "https"):
+        raise LfsError("LFS url can be derived from http(s) remote only, set it explicitly")
+
+    path = parsed.path.rstrip("/")
+    if not path.endswith(".git"):
+        path += ".git"
+
+    return urllib.parse.urlunsplit(parsed._replace(path=f"{path}/info/lfs"))
+
+
+class LfsClient:
+    """
+    Minimal client of git-lfs batch API with basic transfer adapter.
+    Credentials of url are sent as basic auth to LFS server only, transfer urls carry their own headers.
+    """
+
+    def __init__(self, url: str, timeout: float) -> None:
+        parsed = urllib.parse.urlsplit(url)
+        self._url = urllib.parse.urlunsplit(parsed._replace(netloc=parsed.netloc.rpartition("@")[2]))
+        self._timeout = timeout
+
+        self._headers = {"Accept": _MEDIA_TYPE, "Content-Type": _MEDIA_TYPE}
+        if parsed.username is not None:
+            credentials = f"{urllib.parse.unquote(parsed.username)}:{urllib.parse.unquote(parsed.password or '')}"
+            self._headers["Authorization"] = f"Basic {base64.b64encode(credentials.encode()).decode()}"
+
+    def batch(self, operation: typing.Literal["download", "upload"], pointers: list[LfsPointer]) -> list[typing.Any]:
+        body = {
+            "operation": operation,
+            "transfers": ["basic"],
+            "objects": [{"oid": pointer.oid, "size": pointer.size} for pointer in pointers],
+        }
+        response = self._request(
+            url=f"{self._url}/objects/batch",
+            method="POST",
+            headers=self._headers,
+            data=json.dumps(body).encode(),
+        )
+
+        return json.loads(response)["objects"]
+
+    def download(self, action: dict[str, typing.Any], pointer: LfsPointer, path: str) -> None:
+        request = urllib.request.Request(action["href"], headers=action.get("header", {}), method="GET")
+        digest = hashlib.sha256()
+        size = 0
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, prefix=f".{pointer.oid}.", delete=False) as file:
+            try:
+                with self._open(request) as response:
+                    while chunk := response.read(_CHUNK_SIZE):
+                        digest.update(chunk)
+                        size += len(chunk)
+                        file.write(chunk)
+                file.close()
+
+                if digest.hexdigest() != pointer.oid or size != pointer.size:
+                    raise LfsError(f"Downloaded object {pointer.oid} does not match its pointer")
+                os.replace(file.name, path)
+            except BaseException:
+                os.remove(file.name)
+                raise
+
+    def upload(self, action: dict[str, typing.Any], pointer: LfsPointer, path: str) -> None:
+        headers = {"Content-Type": "application/octet-stream", **action.get("header", {})}
+        headers["Content-Length"] = str(pointer.size)
+
+        with open(path, "rb") as file:
+            request = urllib.request.Request(action["href"], headers=headers, data=file, method="PUT")
+            with self._open(request) as response:
+                response.read()
+
+    def verify(self, action: dict[str, typing.Any], pointer: LfsPointer) -> None:
+        self._request(
+            url=action["href"],
+            method="POST",
+            headers={**self._headers, **action.get("header", {})},
+            data=json.dumps({"oid": pointer.oid, "size": pointer.size}).encode(),
+        )
+
+    def _request(self, url: str, method: str, headers: dict[str, str], data: bytes) -> bytes:
+        request = urllib.request.Request(url, headers=headers, data=data, method=method)
+        with self._open(request) as response:
+            return response.read()
+
+    def _open(self, request: urllib.request.Request) -> typing.Any:
+        try:
+            return urllib.request.urlopen(request, timeout=self._timeout)
+        except urllib.error.HTTPError as error:
+            raise LfsError(f"LFS request {request.get_method()} has failed with status {error.code}") from error
+
+
+def _get_actions(objects: list[typing.Any], operation: str) -> dict[str, dict[str, typing.Any]]:
+    actions: dict[str, dict[str, typing.Any]] = {}
+    for item in objects:
+        if "error" in item:
+            raise LfsError(f"LFS {operation} of object {item['oid']} has failed: {item['error'].get('message')}")
+        actions[item["oid"]] = item.get("actions", {})
+
+    return actions
+
+
+def _mirror_object(
+    pointer: LfsPointer,
+    upload_actions: dict[str, typing.Any],
+    download_actions: dict[str, typing.Any] | None,
+    source: LfsClient,
+    target: LfsClient,
+    cache: LfsCache,
+) -> None:
+    path = cache.get_object_path(pointer.oid)
+
+    with _DOWNLOAD_LOCKS[int(pointer.oid[:8], 16) % len(_DOWNLOAD_LOCKS)]:
+        # Concurrent sync could have cached object while this one was waiting for the lock
+        if not cache.has_object(pointer):
+            if download_actions is None or "download" not in download_actions:
+                raise LfsError(f"LFS server of source has no download action for object {pointer.oid}")
+            source.download(download_actions["download"], pointer=pointer, path=path)
+
+    target.upload(upload_actions["upload"], pointer=pointer, path=path)
+    if "verify" in upload_actions:
+        target.verify(upload_actions["verify"], pointer=pointer)
+
+
+def mirror_lfs_objects(
+    pointers: list[LfsPointer],
+    source_url: str,
+    target_url: str,
+    cache: LfsCache,
+    mirroring: LfsMirroring,
+    logger: logging_utils.AbstractLogger,
+) -> int:
+    """
+    Uploads objects missing on target LFS server, objects absent in cache are downloaded from source first.
+    Returns number of uploaded objects.
+
+    :raises LfsError when some object can't be mirrored.
+    """
+    source = LfsClient(url=source_url, timeout=mirroring.timeout)
+    target = LfsClient(url=target_url, timeout=mirroring.timeout)
+
+    uploaded = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=mirroring.max_workers) as executor:
+        for offset in range(0, len(pointers), mirroring.batch_size):
+            batch = pointers[offset : offset + mirroring.batch_size]
+            # Target returns no upload action for objects it already has
+            upload_actions = _get_actions(target.batch("upload", batch), "upload")
+            missing = [pointer for pointer in batch if "upload" in upload_actions.get(pointer.oid, {})]
+            if not missing:
+                continue
+
+            uncached = [pointer for pointer in missing if not cache.has_object(pointer)]
+            download_actions: dict[str, dict[str, typing.Any]] = {}
+            if uncached:
+                download_actions = _get_actions(source.batch("download", uncached), "download")
+
+            logger.info(
+                "Mirroring %d of %d LFS object(s), %d cached...",
+                len(missing),
+                len(batch),
+                len(missing) - len(uncached),
+            )
+            futures = [
+                executor.submit(
+                    _mirror_object,
+                    pointer=pointer,
+                    upload_actions=upload_actions[pointer.oid],
+                    download_actions=download_actions.get(pointer.oid),
+                    source=source,
+                    target=target,
+                    cache=cache,
+                )
+                for pointer in missing
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+            uploaded += len(missing)
+
+    return uploaded
+
+
+__all__ = [
+    "LfsCache",
+    "LfsClient",
+    "LfsError",
+    "LfsMirroring",
+    "LfsPointer",
+    "get_lfs_pointers",
+    "get_lfs_url",
+    "mirror_lfs_objects",
+    "parse_lfs_pointer",
+]
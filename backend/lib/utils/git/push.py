@@ -0,0 +1,177 @@
+import concurrent.futures
+import dataclasses
+import functools
+import typing
+
+import git
+
+import lib.utils.logging as logging_utils
+
+
+class PushError(Exception):
+    def __init__(self, failed_batches: list["PushBatchResult"]) -> None:
+        super().__init__(f"Failed to push {len(failed_batches)} batch(es)")
+        self.failed_batches = failed_batches
+
+
+@dataclasses.dataclass
+class PushBatchResult:
+    index: int
+    refspecs: list[str]
+    attempts: int = 0
+    push_info: list[git.PushInfo] = dataclasses.field(default_factory=list[git.PushInfo])
+    error: Exception | None = None
+
+    @property
+    def is_successful(self) -> bool:
+        return self.error is None
+
+
+def get_local_refs(repo: git.Repo) -> dict[str, str]:
+    output = typing.cast(str, repo.git.for_each_ref("--format=%(objectname) %(refname)"))
+    refs: dict[str, str] = {}
+
+    for line in output.splitlines():
+        sha, ref = line.split(" ", 1)
+        refs[ref] = sha
+
+    return refs
+
+
+def get_remote_refs(repo: git.Repo, remote_name: str) -> dict[str, str]:
+    output = typing.cast(str, repo.git.ls_remote(remote_name))
+    refs: dict[str, str] = {}
+
+    for line in output.splitlines():
+        sha, ref = line.split("\t", 1)
+        if ref == "HEAD" or ref.endswith("^{}"):
+            continue
+        refs[ref] = sha
+
+    return refs
+
+
+def get_mirror_refspecs(local_refs: dict[str, str], remote_refs: dict[str, str]) -> list[str]:
+    """
+    Returns refspecs of refs differing from the remote, branch heads first as they carry most of the history,
+    deletions last.
+    """
+    updated = sorted(ref for ref, sha in local_refs.items() if remote_refs.get(ref) != sha)
+    refspecs = [f"+{ref}:{ref}" for ref in sorted(updated, key=lambda ref: not ref.startswith("refs/heads/"))]
+    refspecs.extend(f":{ref}" for ref in sorted(remote_refs) if ref not in local_refs)
+
+    return refspecs
+
+
+def _push_batch(remote: git.Remote, batch: PushBatchResult) -> PushBatchResult:
+    batch.attempts += 1
+    try:
+        push_info = remote.push(refspec=batch.refspecs)
+        batch.push_info = list(push_info)
+        push_info.raise_if_error()
+    except Exception as error:
+        batch.error = error
+    else:
+        batch.error = None
+
+    return batch
+
+
+def _push_with_retries(
+    executor: concurrent.futures.ThreadPoolExecutor,
+    remote: git.Remote,
+    batches: list[PushBatchResult],
+    batch_count: int,
+    retries: int,
+    logger: logging_utils.AbstractLogger,
+) -> list[PushBatchResult]:
+    """
+    Pushes batches in parallel retrying failed ones, returns batches failed after all retries.
+    """
+    pending: list[PushBatchResult] = batches
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        if attempt > 0:
+            logger.info("Retrying %d failed batch(es), attempt %d...", len(pending), attempt + 1)
+
+        for batch in executor.map(functools.partial(_push_batch, remote), pending):
+            if batch.is_successful:
+                logger.info("Batch %d/%d pushed, %d ref(s)", batch.index + 1, batch_count, len(batch.refspecs))
+            else:
+                logger.warning(
+                    "Batch %d/%d failed on attempt %d: %s",
+                    batch.index + 1,
+                    batch_count,
+                    batch.attempts,
+                    batch.error,
+                )
+
+        pending = [batch for batch in pending if not batch.is_successful]
+
+    return pending
+
+
+def push_in_batches(
+    repo: git.Repo,
+    remote_name: str,
+    batch_size: int,
+    max_workers: int,
+    retries: int,
+    logger: logging_utils.AbstractLogger,
+    remote_refs: dict[str, str] | None = None,
+) -> list[PushBatchResult]:
+    """
+    Mirrors local refs to the remote in bounded batches, first batch is pushed alone, the rest in parallel.
+    Only refs differing from the remote are pushed, so an interrupted push resumes on the next run.
+    Remote refs are listed unless already known.
+
+    :raises PushError when some batches have failed after all retries.
+    """
+    # Remote-tracking refs are not needed and would be concurrently updated by parallel pushes
+    try:
+        repo.git.config("--unset-all", f"remote.{remote_name}.fetch")
+    except git.GitCommandError as error:
+        # Nothing to unset, e.g. refs have already been pushed in batches
+        if error.status != 5:
+            raise
+    remote = repo.remote(name=remote_name)
+
+    if remote_refs is None:
+        remote_refs = get_remote_refs(repo, remote_name)
+    refspecs = get_mirror_refspecs(local_refs=get_local_refs(repo), remote_refs=remote_refs)
+    batches = [
+        PushBatchResult(index=index, refspecs=refspecs[offset : offset + batch_size])
+        for index, offset in enumerate(range(0, len(refspecs), batch_size))
+    ]
+    logger.info("Pushing %d ref update(s) in %d batch(es)...", len(refspecs), len(batches))
+
+    failed: list[PushBatchResult] = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # First batch goes alone, so parallel batches don't each send history missing on the remote, e.g. empty one
+        for group in (batches[:1], batches[1:]):
+            failed.extend(
+                _push_with_retries(
+                    executor=executor,
+                    remote=remote,
+                    batches=group,
+                    batch_count=len(batches),
+                    retries=retries,
+                    logger=logger,
+                )
+            )
+
+    if failed:
+        raise PushError(failed_batches=failed)
+
+    return batches
+
+
+__all__ = [
+    "PushBatchResult",
+    "PushError",
+    "get_local_refs",
+    "get_mirror_refspecs",
+    "get_remote_refs",
+    "push_in_batches",
+]
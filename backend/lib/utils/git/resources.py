@@ -0,0 +1,133 @@
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import resource
+import typing
+
+
+@dataclasses.dataclass(frozen=True)
+class ResourceLimits:
+    pack_window_memory: str | None = None  # git size, e.g. "256m"
+    pack_threads: int | None = None
+    pack_delta_cache_size: str | None = None  # git size, e.g. "128m"
+    isolate: bool = False  # run sync in child process
+    memory_limit: int | None = None  # bytes, address space limit of child process and its git processes
+    cpu_time_limit: int | None = None  # seconds, CPU time limit of child process and its git processes
+
+    @property
+    def git_config(self) -> dict[str, str]:
+        config: dict[str, str] = {}
+        if self.pack_window_memory is not None:
+            config["pack.windowMemory"] = self.pack_window_memory
+        if self.pack_threads is not None:
+            config["pack.threads"] = str(self.pack_threads)
+        if self.pack_delta_cache_size is not None:
+            config["pack.deltaCacheSize"] = self.pack_delta_cache_size
+
+        return config
+
+    def apply_rlimits(self) -> None:
+        if self.memory_limit is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (self.memory_limit, self.memory_limit))
+        if self.cpu_time_limit is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, (self.cpu_time_limit, self.cpu_time_limit))
+
+
+def get_git_config_env(config: dict[str, str]) -> dict[str, str]:
+    """
+    Passes config to every git command without touching config files, requires git 2.31+.
+    """
+    env = {"GIT_CONFIG_COUNT": str(len(config))}
+    for index, (key, value) in enumerate(config.items()):
+        env[f"GIT_CONFIG_KEY_{index}"] = key
+        env[f"GIT_CONFIG_VALUE_{index}"] = value
+
+    return env
+
+
+def get_available_memory() -> int | None:
+    try:
+        with open("/proc/meminfo") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return None
+
+
+class MemoryBudget:
+    """
+    Limits total memory reserved by concurrently running syncs.
+    Reservation larger than the whole budget is clamped, so such sync runs alone.
+    Reservations are admitted in arrival order, so smaller ones can't overtake a large one and starve it.
+    Reservations are awaited on event loop, so syncs waiting for memory don't hold executor workers.
+    """
+
+    def __init__(self, total: int) -> None:
+        self._total = total
+        self._available = total
+        self._waiters: collections.deque[tuple[int, asyncio.Future[None]]] = collections.deque()
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    @property
+    def available(self) -> int:
+        return self._available
+
+    @contextlib.asynccontextmanager
+    async def reserve(self, amount: int) -> typing.AsyncIterator[None]:
+        amount = min(amount, self._total)
+
+        await self._acquire(amount)
+        try:
+            yield
+        finally:
+            self._release(amount)
+
+    async def _acquire(self, amount: int) -> None:
+        self._discard_done_waiters()
+        if not self._waiters and self._available >= amount:
+            self._available -= amount
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((amount, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Memory has already been handed over, pass it to next waiters
+                self._release(amount)
+            else:
+                # Waiters behind may fit now that this one is gone
+                self._admit()
+            raise
+
+    def _release(self, amount: int) -> None:
+        self._available += amount
+        self._admit()
+
+    def _admit(self) -> None:
+        self._discard_done_waiters()
+        while self._waiters and self._waiters[0][0] <= self._available:
+            amount, future = self._waiters.popleft()
+            self._available -= amount
+            future.set_result(None)
+            self._discard_done_waiters()
+
+    def _discard_done_waiters(self) -> None:
+        while self._waiters and self._waiters[0][1].done():
+            self._waiters.popleft()
+
+
+__all__ = [
+    "MemoryBudget",
+    "ResourceLimits",
+    "get_available_memory",
+    "get_git_config_env",
+]
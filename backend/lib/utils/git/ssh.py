@@ -0,0 +1,115 @@
+import dataclasses
+import glob
+import logging
+import os
+import shlex
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+
+import lib.utils.logging as logging_utils
+
+logger = logging.getLogger(__name__)
+
+# Unix socket path limit without terminating null byte
+_MAX_SOCKET_PATH_LENGTH = 107 if sys.platform == "linux" else 103
+_CONTROL_NAME_LENGTH = 40  # %C is sha1 hex digest
+# ssh binds master socket to control path with random ".XXXXXXXXXXXXXXXX" suffix and renames it then
+_CONTROL_SUFFIX_LENGTH = 17
+
+
+@dataclasses.dataclass(frozen=True)
+class SshMultiplexing:
+    control_dir: str
+    control_persist: int  # seconds, idle master connection is closed after it
+    command: str = "ssh"
+
+    @property
+    def git_ssh_command(self) -> str:
+        # %C is a hash of local host, remote host, port and user, so each host gets one master
+        # and socket path fits into unix socket path length limit
+        control_path = os.path.join(self.control_dir, "%C")
+        return " ".join(
+            [
+                self.command,
+                "-o ControlMaster=auto",
+                f"-o ControlPath={shlex.quote(control_path)}",
+                f"-o ControlPersist={self.control_persist}",
+            ]
+        )
+
+
+class SshControlMasters:
+    """
+    Owns directory of ssh control master sockets shared by git processes of all syncs.
+    Masters are started by ssh on first connection to a host and exit after being idle for control_persist.
+    """
+
+    def __init__(
+        self,
+        control_persist: int,
+        control_dir: str | None = None,
+        command: str | None = None,
+        logger: logging_utils.AbstractLogger = logger,
+    ) -> None:
+        self._is_temporary = control_dir is None
+        if control_dir is None:
+            control_dir = tempfile.mkdtemp(prefix="git-syncer-ssh-")
+        self._multiplexing = SshMultiplexing(
+            control_dir=control_dir,
+            control_persist=control_persist,
+            command=command if command is not None else os.environ.get("GIT_SSH_COMMAND", "ssh"),
+        )
+        self._logger = logger
+
+    @property
+    def multiplexing(self) -> SshMultiplexing:
+        return self._multiplexing
+
+    def prepare(self) -> None:
+        """
+        :raises ValueError when control socket path would exceed unix socket path limit, ssh refuses to connect then.
+        """
+        control_path_length = len(
+            os.path.join(self._multiplexing.control_dir, "x" * (_CONTROL_NAME_LENGTH + _CONTROL_SUFFIX_LENGTH)).encode()
+        )
+        if control_path_length > _MAX_SOCKET_PATH_LENGTH:
+            raise ValueError(
+                f"SSH control socket path in {self._multiplexing.control_dir} would be {control_path_length} bytes long, "
+                f"at most {_MAX_SOCKET_PATH_LENGTH} bytes are supported"
+            )
+
+        # Anyone able to connect to control socket can use authenticated connection
+        os.makedirs(self._multiplexing.control_dir, mode=0o700, exist_ok=True)
+        os.chmod(self._multiplexing.control_dir, 0o700)
+
+    def close(self) -> None:
+        for control_path in glob.glob(os.path.join(glob.escape(self._multiplexing.control_dir), "*")):
+            try:
+                if not stat.S_ISSOCK(os.stat(control_path).st_mode):
+                    continue
+            except FileNotFoundError:
+                # Master has already exited being idle
+                continue
+
+            self._logger.info("Stopping ssh control master %s", control_path)
+            # Host is required by ssh, but not used as control path is explicit
+            result = subprocess.run(
+                [*shlex.split(self._multiplexing.command), "-o", f"ControlPath={control_path}", "-O", "exit", "_"],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
+            if result.returncode != 0:
+                self._logger.warning("Failed to stop ssh control master %s: %s", control_path, result.stderr.strip())
+
+        if self._is_temporary:
+            shutil.rmtree(self._multiplexing.control_dir, ignore_errors=True)
+
+
+__all__ = [
+    "SshControlMasters",
+    "SshMultiplexing",
+]
@@ -0,0 +1,64 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+
+import lib.utils.logging as logging_utils
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class SyncStats:
+    duration: float  # seconds
+    size: int  # bytes
+
+
+@dataclasses.dataclass
+class SyncStatsStore:
+    """
+    Keeps stats of last successful sync of each repo in its own file, so they survive restarts.
+    """
+
+    path: str
+
+    def get_stats_path(self, source: str, target: str) -> str:
+        key = hashlib.sha256(f"{source}\n{target}".encode()).hexdigest()
+        return os.path.join(self.path, f"{key}.json")
+
+    def load(
+        self,
+        source: str,
+        target: str,
+        logger: logging_utils.AbstractLogger = logger,
+    ) -> SyncStats | None:
+        stats_path = self.get_stats_path(source=source, target=target)
+        try:
+            with open(stats_path) as file:
+                data = json.load(file)
+            return SyncStats(duration=float(data["duration"]), size=int(data["size"]))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("Failed to load sync stats %s, it will be overwritten", stats_path, exc_info=True)
+            return None
+
+    def save(self, source: str, target: str, stats: SyncStats) -> None:
+        stats_path = self.get_stats_path(source=source, target=target)
+        os.makedirs(self.path, exist_ok=True)
+
+        temp_path = f"{stats_path}.tmp"
+        try:
+            with open(temp_path, "w") as file:
+                json.dump(dataclasses.asdict(stats), file)
+            os.replace(temp_path, stats_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+__all__ = [
+    "SyncStats",
+    "SyncStatsStore",
+]
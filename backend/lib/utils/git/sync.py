@@ -1,52 +1,209 @@
+import abc
 import dataclasses
-import re
+import os
+import shutil
 import tempfile
+import typing
 
 import git
 
+import lib.utils.git.bundle as bundle_utils
+import lib.utils.git.events as events_utils
+import lib.utils.git.filters as filters_utils
+import lib.utils.git.lfs as lfs_utils
+import lib.utils.git.push as push_utils
+import lib.utils.git.resources as resources_utils
+import lib.utils.git.ssh as ssh_utils
+import lib.utils.isolation as isolation_utils
 import lib.utils.logging as logging_utils
 
 DESTINATION_REMOTE_NAME = "destination"
 
+SyncEngineName = typing.Literal["cli", "dulwich"]
+
 
 @dataclasses.dataclass
 class SyncRepoTask:
     source: str
     target: str
-    include_ref: set[str]
-    include_ref_regex: list[re.Pattern[str]]
-    exclude_ref: set[str]
-    exclude_ref_regex: list[re.Pattern[str]]
+    ref_filter: filters_utils.RefFilter
+    bundle_export_path: str | None = None
+    push_batch_size: int = 0  # 0 means single mirror push
+    push_max_workers: int = 1
+    push_batch_retries: int = 2
+    resources: resources_utils.ResourceLimits = resources_utils.ResourceLimits()
+    track_ref_changes: bool = False  # lists target refs before push to report ref changes
+    ssh_multiplexing: ssh_utils.SshMultiplexing | None = None
+    lfs: lfs_utils.LfsMirroring | None = None  # None means LFS objects are not mirrored
+    lfs_cache: lfs_utils.LfsCache | None = None  # None means objects are cached during sync only
+    engine: SyncEngineName = "cli"
+
+    @property
+    def git_env(self) -> dict[str, str]:
+        env: dict[str, str] = {}
+
+        git_config = self.resources.git_config
+        if git_config:
+            env.update(resources_utils.get_git_config_env(git_config))
+        if self.ssh_multiplexing is not None:
+            env["GIT_SSH_COMMAND"] = self.ssh_multiplexing.git_ssh_command
+
+        return env
+
+
+@dataclasses.dataclass
+class SyncRepoResult:
+    repo_size: int  # bytes
+    ref_changes: list[events_utils.RefChange] = dataclasses.field(default_factory=list[events_utils.RefChange])
+
+
+class SyncRepoCallable(typing.Protocol):
+    def __call__(
+        self,
+        task: SyncRepoTask,
+        logger: logging_utils.AbstractLogger,
+        bundle_cache: bundle_utils.BundleCache | None = None,
+    ) -> SyncRepoResult: ...
+
+
+class SyncEngine(abc.ABC):
+    """
+    Syncs repo in current process, sync_repo selects engine by SyncRepoTask.engine.
+    """
+
+    @abc.abstractmethod
+    def sync(
+        self,
+        task: SyncRepoTask,
+        logger: logging_utils.AbstractLogger,
+        bundle_cache: bundle_utils.BundleCache | None = None,
+    ) -> SyncRepoResult: ...
+
+
+class CliSyncEngine(SyncEngine):
+    """
+    Runs git CLI through GitPython, supports all sync features.
+    """
+
+    def sync(
+        self,
+        task: SyncRepoTask,
+        logger: logging_utils.AbstractLogger,
+        bundle_cache: bundle_utils.BundleCache | None = None,
+    ) -> SyncRepoResult:
+        return _sync_repo(task=task, logger=logger, bundle_cache=bundle_cache)
+
+
+def get_sync_engine(name: SyncEngineName) -> SyncEngine:
+    if name == "dulwich":
+        # Optional dependency, imported only when engine is used
+        import lib.utils.git.dulwich_engine as dulwich_engine_utils
+
+        return dulwich_engine_utils.DulwichSyncEngine()
+
+    return CliSyncEngine()
+
+
+def _clone_from_bundle(
+    task: SyncRepoTask,
+    bundle_path: str,
+    repo_path: str,
+    logger: logging_utils.AbstractLogger,
+) -> git.Repo | None:
+    logger.info("Seeding from bundle %s", bundle_path)
+    try:
+        repo = git.Repo.clone_from(bundle_path, repo_path, env=task.git_env, mirror=True)
+    except git.GitCommandError:
+        logger.warning("Failed to seed from bundle %s, it will be removed", bundle_path, exc_info=True)
+        os.remove(bundle_path)
+        return None
+
+    logger.info("Fetching updates from %s", task.source)
+    repo.git.update_environment(**task.git_env)
+    origin = repo.remote(name="origin")
+    origin.set_url(task.source)
+    origin.fetch(prune=True)
+
+    return repo
+
+
+def _clone(
+    task: SyncRepoTask,
+    repo_path: str,
+    logger: logging_utils.AbstractLogger,
+    bundle_path: str | None,
+) -> git.Repo:
+    if bundle_path is not None and os.path.exists(bundle_path):
+        repo = _clone_from_bundle(task=task, bundle_path=bundle_path, repo_path=repo_path, logger=logger)
+        if repo is not None:
+            return repo
+        if os.path.exists(repo_path):
+            shutil.rmtree(repo_path)
 
+    logger.info("Cloning from %s to %s", task.source, task.target)
+    repo = git.Repo.clone_from(task.source, repo_path, env=task.git_env, mirror=True)
+    repo.git.update_environment(**task.git_env)
 
-def _is_ref_included(
-    ref_path: str,
+    return repo
+
+
+def _update_bundle(
     task: SyncRepoTask,
-):
-    if ref_path in task.exclude_ref:
-        return False
+    repo: git.Repo,
+    bundle_cache: bundle_utils.BundleCache,
+    bundle_path: str,
+    logger: logging_utils.AbstractLogger,
+) -> None:
+    if not bundle_cache.is_stale(bundle_path):
+        return
 
-    for regex in task.exclude_ref_regex:
-        if regex.match(ref_path):
-            return False
+    if not repo.references:
+        logger.info("No refs to bundle, skipping bundle update")
+        return
 
-    if ref_path in task.include_ref:
-        return True
+    logger.info("Writing bundle %s", bundle_path)
+    bundle_utils.write_bundle(repo=repo, bundle_path=bundle_path)
 
-    for regex in task.include_ref_regex:
-        if regex.match(ref_path):
-            return True
+    if task.bundle_export_path is not None:
+        logger.info("Exporting bundle to %s", task.bundle_export_path)
+        bundle_utils.export_bundle(bundle_path=bundle_path, export_path=task.bundle_export_path)
 
-    if not task.include_ref and not task.include_ref_regex:
-        return True
 
-    return False
+def sync_repo(
+    task: SyncRepoTask,
+    logger: logging_utils.AbstractLogger,
+    bundle_cache: bundle_utils.BundleCache | None = None,
+) -> SyncRepoResult:
+    engine = get_sync_engine(task.engine)
+    if not task.resources.isolate:
+        return engine.sync(task=task, logger=logger, bundle_cache=bundle_cache)
+
+    logger.info("Running sync in isolated process...")
+    return isolation_utils.run_isolated(
+        func=engine.sync,
+        kwargs={"task": task, "bundle_cache": bundle_cache},
+        logger=logger,
+        prepare=task.resources.apply_rlimits,
+    )
 
 
-def sync_repo(task: SyncRepoTask, logger: logging_utils.AbstractLogger):
+def _sync_repo(
+    task: SyncRepoTask,
+    logger: logging_utils.AbstractLogger,
+    bundle_cache: bundle_utils.BundleCache | None = None,
+) -> SyncRepoResult:
+    bundle_path = None
+    if bundle_cache is not None:
+        bundle_path = bundle_cache.get_bundle_path(source=task.source, target=task.target)
+
     with tempfile.TemporaryDirectory() as temp_dir:
-        logger.info("Cloning from %s to %s", task.source, task.target)
-        temp_repo = git.Repo.clone_from(task.source, temp_dir, mirror=True)
+        repo_path = os.path.join(temp_dir, "repo.git")
+        temp_repo = _clone(
+            task=task,
+            repo_path=repo_path,
+            logger=logger,
+            bundle_path=bundle_path,
+        )
 
         logger.info("Fetched refs:")
         for ref in temp_repo.references:
@@ -54,27 +211,134 @@ def sync_repo(task: SyncRepoTask, logger: logging_utils.AbstractLogger):
 
         logger.info("Deleting excluded refs...")
         for ref in temp_repo.references:
-            if _is_ref_included(ref_path=ref.path, task=task):
+            if task.ref_filter.is_included(ref.path):
                 continue
 
             logger.info("\t%s", ref.path)
             git.Reference.delete(temp_repo, ref.path)
 
+        if bundle_cache is not None and bundle_path is not None:
+            _update_bundle(
+                task=task,
+                repo=temp_repo,
+                bundle_cache=bundle_cache,
+                bundle_path=bundle_path,
+                logger=logger,
+            )
+
         logger.info("Creating destination remote...")
         temp_repo.create_remote(DESTINATION_REMOTE_NAME, url=task.target)
 
-        logger.info("Pushing...")
-        destination = temp_repo.remote(name=DESTINATION_REMOTE_NAME)
-        push_info = destination.push(mirror=True)
+        if task.lfs is not None:
+            # Objects are uploaded before refs, so target never has pointers to missing objects
+            _mirror_lfs(task=task, lfs=task.lfs, repo=temp_repo, temp_dir=temp_dir, logger=logger)
 
-        logger.info("Pushed refs:")
-        for info in push_info:
-            logger.info("\t%s %s", info.remote_ref_string, info.summary.strip("\n"))
+        local_refs = None
+        remote_refs = None
+        if task.track_ref_changes:
+            logger.info("Listing destination refs...")
+            # Listed before push, as push adds remote-tracking refs
+            local_refs = push_utils.get_local_refs(temp_repo)
+            remote_refs = push_utils.get_remote_refs(temp_repo, DESTINATION_REMOTE_NAME)
+
+        if task.push_batch_size > 0:
+            _push_in_batches(task=task, repo=temp_repo, logger=logger, remote_refs=remote_refs)
+        else:
+            _push_mirror(repo=temp_repo, logger=logger)
+
+        ref_changes: list[events_utils.RefChange] = []
+        if local_refs is not None and remote_refs is not None:
+            # Push has succeeded, so destination refs are the same as local ones
+            ref_changes = events_utils.get_ref_changes(old_refs=remote_refs, new_refs=local_refs)
+
+        return SyncRepoResult(repo_size=get_directory_size(repo_path), ref_changes=ref_changes)
+
+
+def _mirror_lfs(
+    task: SyncRepoTask,
+    lfs: lfs_utils.LfsMirroring,
+    repo: git.Repo,
+    temp_dir: str,
+    logger: logging_utils.AbstractLogger,
+) -> None:
+    mirrored_commits: list[str] = []
+    if task.lfs_cache is not None:
+        mirrored_commits = task.lfs_cache.load_mirrored_commits(source=task.source, target=task.target)
 
-        push_info.raise_if_error()
+    logger.info("Listing LFS objects...")
+    pointers = lfs_utils.get_lfs_pointers(repo, exclude_commits=mirrored_commits)
+    logger.info("Found %d LFS object(s) since %d mirrored commit(s)", len(pointers), len(mirrored_commits))
+    if pointers:
+        uploaded = lfs_utils.mirror_lfs_objects(
+            pointers=pointers,
+            source_url=lfs.source_url or lfs_utils.get_lfs_url(task.source),
+            target_url=lfs.target_url or lfs_utils.get_lfs_url(task.target),
+            cache=task.lfs_cache or lfs_utils.LfsCache(path=os.path.join(temp_dir, "lfs")),
+            mirroring=lfs,
+            logger=logger,
+        )
+        logger.info("Uploaded %d LFS object(s)", uploaded)
+
+    if task.lfs_cache is not None:
+        # All objects reachable from current refs are on target now, next sync scans only new history
+        task.lfs_cache.save_mirrored_commits(
+            source=task.source,
+            target=task.target,
+            commits=sorted(set(push_utils.get_local_refs(repo).values())),
+        )
+
+
+def get_directory_size(path: str) -> int:
+    size = 0
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            size += os.path.getsize(os.path.join(dir_path, file_name))
+
+    return size
+
+
+def _push_mirror(repo: git.Repo, logger: logging_utils.AbstractLogger) -> None:
+    logger.info("Pushing...")
+    destination = repo.remote(name=DESTINATION_REMOTE_NAME)
+    push_info = destination.push(mirror=True)
+
+    logger.info("Pushed refs:")
+    for info in push_info:
+        logger.info("\t%s %s", info.remote_ref_string, info.summary.strip("\n"))
+
+    push_info.raise_if_error()
+
+
+def _push_in_batches(
+    task: SyncRepoTask,
+    repo: git.Repo,
+    logger: logging_utils.AbstractLogger,
+    remote_refs: dict[str, str] | None = None,
+) -> None:
+    batches = push_utils.push_in_batches(
+        repo=repo,
+        remote_name=DESTINATION_REMOTE_NAME,
+        batch_size=task.push_batch_size,
+        max_workers=task.push_max_workers,
+        retries=task.push_batch_retries,
+        logger=logger,
+        remote_refs=remote_refs,
+    )
+
+    logger.info("Pushed refs:")
+    for batch in batches:
+        for info in batch.push_info:
+            logger.info("\t%s %s", info.remote_ref_string, info.summary.strip("\n"))
 
 
 __all__ = [
+    "CliSyncEngine",
+    "SyncEngine",
+    "SyncEngineName",
+    "SyncRepoCallable",
+    "SyncRepoResult",
     "SyncRepoTask",
+    "get_directory_size",
+    "get_sync_engine",
     "sync_repo",
 ]
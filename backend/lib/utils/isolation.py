@@ -0,0 +1,96 @@
+import logging
+import multiprocessing
+import multiprocessing.connection
+import traceback
+import typing
+
+import lib.utils.logging as logging_utils
+
+T = typing.TypeVar("T")
+
+
+class IsolatedProcessError(Exception): ...
+
+
+class _ConnectionHandler(logging.Handler):
+    def __init__(self, connection: multiprocessing.connection.Connection) -> None:
+        super().__init__()
+        self._connection = connection
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._connection.send(("log", record.levelno, record.getMessage()))
+
+
+def _run_child(
+    func: typing.Callable[..., typing.Any],
+    kwargs: dict[str, typing.Any],
+    prepare: typing.Callable[[], None] | None,
+    connection: multiprocessing.connection.Connection,
+) -> None:
+    logger = logging.getLogger("isolated")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.addHandler(_ConnectionHandler(connection))
+
+    try:
+        if prepare is not None:
+            prepare()
+        result = func(logger=logger, **kwargs)
+    except BaseException:
+        connection.send(("error", traceback.format_exc()))
+    else:
+        connection.send(("result", result))
+    finally:
+        connection.close()
+
+
+def run_isolated(
+    func: typing.Callable[..., T],
+    kwargs: dict[str, typing.Any],
+    logger: logging_utils.AbstractLogger,
+    prepare: typing.Callable[[], None] | None = None,
+) -> T:
+    """
+    Runs func(logger=..., **kwargs) in a child process, logs of child are passed to logger.
+    Func, kwargs, prepare and result must be picklable.
+
+    :raises IsolatedProcessError when func has failed or child process has died.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_run_child,
+        args=(func, kwargs, prepare, sender),
+        daemon=True,
+    )
+    process.start()
+    sender.close()
+
+    messages: list[tuple[typing.Any, ...]] = []
+    try:
+        while True:
+            try:
+                message = receiver.recv()
+            except EOFError:
+                break
+            if message[0] == "log":
+                logger.log(message[1], "%s", message[2])
+            else:
+                messages.append(message)
+    finally:
+        process.join()
+        receiver.close()
+
+    for message in messages:
+        if message[0] == "error":
+            raise IsolatedProcessError(f"Isolated process has failed:\n{message[1]}")
+        if message[0] == "result":
+            return message[1]
+
+    raise IsolatedProcessError(f"Isolated process has exited with code {process.exitcode}")
+
+
+__all__ = [
+    "IsolatedProcessError",
+    "run_isolated",
+]
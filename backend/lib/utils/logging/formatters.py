@@ -11,6 +11,13 @@ def register_secret(value: str, replace_value: str) -> None:
     _SECRETS[value] = replace_value
 
 
+def mask_secrets(value: str) -> str:
+    for secret_value, replace_value in _SECRETS.items():
+        value = value.replace(secret_value, f"***{replace_value}***")
+
+    return value
+
+
 class CustomFormatter(logging.Formatter):
     def __init__(
         self,
@@ -22,13 +29,11 @@ class CustomFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         log_message = super().format(record)
 
-        for value, replace_value in _SECRETS.items():
-            log_message = log_message.replace(value, f"***{replace_value}***")
-
-        return log_message
+        return mask_secrets(log_message)
 
 
 __all__ = [
     "CustomFormatter",
+    "mask_secrets",
     "register_secret",
 ]
@@ -0,0 +1,115 @@
+import asyncio
+import collections
+import faulthandler
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import types
+
+import lib.utils.logging as logging_utils
+
+logger = logging.getLogger(__name__)
+
+
+def _format_stack(frame: types.FrameType | None) -> list[str]:
+    stack: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+
+    stack.reverse()
+    return stack
+
+
+class SamplingProfiler:
+    """
+    Signal-triggered sampling profiler of all threads, including event loop and executor threads.
+    Nothing runs until the signal is received.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        duration: float,
+        interval: float,
+        signal_name: str = "SIGUSR1",
+        logger: logging_utils.AbstractLogger = logger,
+    ) -> None:
+        self._directory = directory
+        self._duration = duration
+        self._interval = interval
+        self._signal = signal.Signals[signal_name]
+        self._logger = logger
+
+        self._thread: threading.Thread | None = None
+
+    @property
+    def is_active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def install(self) -> None:
+        asyncio.get_running_loop().add_signal_handler(self._signal, self.trigger)
+
+    def uninstall(self) -> None:
+        asyncio.get_running_loop().remove_signal_handler(self._signal)
+
+    def trigger(self) -> None:
+        if self.is_active:
+            self._logger.warning("Profiling is already running, skipping")
+            return
+
+        os.makedirs(self._directory, exist_ok=True)
+        prefix = os.path.join(self._directory, time.strftime("%Y%m%d-%H%M%S"))
+
+        self._dump_stacks(f"{prefix}-stacks.txt")
+        self._thread = threading.Thread(
+            target=self._profile,
+            kwargs={"path": f"{prefix}-profile.folded"},
+            name="profiler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _dump_stacks(self, path: str) -> None:
+        with open(path, "w") as file:
+            file.write("Threads:\n\n")
+            file.flush()
+            faulthandler.dump_traceback(file=file, all_threads=True)
+
+            file.write("\nEvent loop tasks:\n\n")
+            for task in asyncio.all_tasks():
+                task.print_stack(file=file)
+                file.write("\n")
+
+        self._logger.info("Stacks have been dumped to %s", path)
+
+    def _profile(self, path: str) -> None:
+        self._logger.info("Profiling for %.1f seconds...", self._duration)
+        own_thread_id = threading.get_ident()
+        samples: collections.Counter[str] = collections.Counter()
+
+        deadline = time.monotonic() + self._duration
+        while time.monotonic() < deadline:
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                thread_name = thread_names.get(thread_id, str(thread_id))
+                samples[";".join([thread_name, *_format_stack(frame)])] += 1
+            time.sleep(self._interval)
+
+        # Folded stacks format, supported by flamegraph.pl and speedscope
+        with open(path, "w") as file:
+            for stack, count in samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+        self._logger.info("Profile has been written to %s", path)
+
+
+__all__ = [
+    "SamplingProfiler",
+]
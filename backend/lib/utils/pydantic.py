@@ -1,34 +1,51 @@
+import importlib.resources.abc
 import os
+import pathlib
 import re
 import typing
 
 import pydantic
+import pydantic_settings
+import yaml
 
 import lib.utils.logging as logging_utils
 
 T = typing.TypeVar("T")
 
+_TEMPLATE_MARKER = "{{"
+_ENV_PATTERN = re.compile(r"{{env \"([A-Z_]+)\"}}")
+_SECRET_ENV_PATTERN = re.compile(r"{{secret_env \"([A-Z_]+)\"}}")
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-def expand_envs(value: str) -> str:
-    def env_repl(match: re.Match[str]) -> str:
-        env_key = match.group(1)
-        env_value = os.environ[env_key]
 
-        return env_value
+def _env_repl(match: re.Match[str]) -> str:
+    env_key = match.group(1)
+    env_value = os.environ[env_key]
 
-    return re.sub(r"{{env \"([A-Z_]+)\"}}", env_repl, value)
+    return env_value
 
 
-def expand_secret_envs(value: str) -> str:
-    def env_repl(match: re.Match[str]) -> str:
-        env_key = match.group(1)
-        env_value = os.environ[env_key]
+def _secret_env_repl(match: re.Match[str]) -> str:
+    env_key = match.group(1)
+    env_value = os.environ[env_key]
+
+    logging_utils.register_secret(env_value, f'{{{{env "{env_key}"}}}}')
+
+    return env_value
+
+
+def expand_envs(value: str) -> str:
+    if _TEMPLATE_MARKER not in value:
+        return value
 
-        logging_utils.register_secret(env_value, f'{{{{env "{env_key}"}}}}')
+    return _ENV_PATTERN.sub(_env_repl, value)
 
-        return env_value
 
-    return re.sub(r"{{secret_env \"([A-Z_]+)\"}}", env_repl, value)
+def expand_secret_envs(value: str) -> str:
+    if _TEMPLATE_MARKER not in value:
+        return value
+
+    return _SECRET_ENV_PATTERN.sub(_secret_env_repl, value)
 
 
 Expanded = typing.Annotated[
@@ -37,4 +54,19 @@ Expanded = typing.Annotated[
     pydantic.BeforeValidator(expand_secret_envs),
 ]
 
-__all__ = ["Expanded"]
+
+class YamlConfigSettingsSource(pydantic_settings.YamlConfigSettingsSource):
+    """
+    Uses libyaml loader when available, it is several times faster on large settings files.
+    """
+
+    # Newer pydantic-settings pass importlib resources as well, so path is opened by its own method
+    def _read_file(self, file_path: pathlib.Path | importlib.resources.abc.Traversable) -> dict[str, typing.Any]:
+        with file_path.open(encoding=self.yaml_file_encoding) as yaml_file:
+            return yaml.load(yaml_file, Loader=_YAML_LOADER) or {}
+
+
+__all__ = [
+    "Expanded",
+    "YamlConfigSettingsSource",
+]
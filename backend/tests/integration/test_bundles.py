@@ -0,0 +1,112 @@
+import logging
+import os
+import pathlib
+
+import git
+import pytest
+
+import lib.utils.git as git_utils
+import tests.utils.git_repos as git_repos_utils
+
+logger = logging.getLogger(__name__)
+
+
+def _create_task(
+    tmp_path: pathlib.Path,
+    bundle_export_path: str | None = None,
+    exclude_ref: list[str] | None = None,
+) -> tuple[git_utils.SyncRepoTask, git.Repo, str]:
+    source = git_repos_utils.create_repo(str(tmp_path / "source"), files={"file.txt": b"initial"})
+    target_path = str(tmp_path / "target.git")
+    git_repos_utils.create_bare_repo(target_path)
+
+    task = git_utils.SyncRepoTask(
+        source=f"file://{source.working_dir}",
+        target=f"file://{target_path}",
+        ref_filter=git_utils.get_ref_filter(
+            include_ref=[],
+            include_ref_regex=[],
+            exclude_ref=exclude_ref or [],
+            exclude_ref_regex=[],
+        ),
+        bundle_export_path=bundle_export_path,
+    )
+    return task, source, target_path
+
+
+def _get_bundle_refs(bundle_path: str) -> dict[str, str]:
+    refs: dict[str, str] = {}
+    for line in git.Git().bundle("list-heads", bundle_path).splitlines():
+        sha, ref = line.split(" ", 1)
+        if ref.startswith("refs/"):
+            refs[ref] = sha
+
+    return refs
+
+
+def test_sync_is_seeded_from_bundle_and_fetches_updates(tmp_path: pathlib.Path, caplog: pytest.LogCaptureFixture):
+    caplog.set_level(logging.INFO)
+    bundle_cache = git_utils.BundleCache(path=str(tmp_path / "bundles"), refresh_interval=3600)
+    task, source, target_path = _create_task(tmp_path)
+    bundle_path = bundle_cache.get_bundle_path(source=task.source, target=task.target)
+
+    git_utils.sync_repo(task=task, logger=logger, bundle_cache=bundle_cache)
+
+    assert _get_bundle_refs(bundle_path) == {"refs/heads/main": source.head.commit.hexsha}
+    assert "Seeding from bundle" not in caplog.text
+
+    caplog.clear()
+    new_sha = git_repos_utils.add_commit(source, files={"file.txt": b"updated"})
+    git_utils.sync_repo(task=task, logger=logger, bundle_cache=bundle_cache)
+
+    assert "Seeding from bundle" in caplog.text
+    assert "Cloning from" not in caplog.text
+    # Commit missing in bundle is fetched from source after seeding
+    assert git_utils.get_local_refs(git.Repo(target_path)) == {"refs/heads/main": new_sha}
+
+
+def test_corrupt_bundle_falls_back_to_clone(tmp_path: pathlib.Path, caplog: pytest.LogCaptureFixture):
+    caplog.set_level(logging.INFO)
+    bundle_cache = git_utils.BundleCache(path=str(tmp_path / "bundles"), refresh_interval=3600)
+    task, source, target_path = _create_task(tmp_path)
+    bundle_path = bundle_cache.get_bundle_path(source=task.source, target=task.target)
+    os.makedirs(bundle_cache.path)
+    with open(bundle_path, "wb") as file:
+        file.write(b"not a bundle")
+
+    git_utils.sync_repo(task=task, logger=logger, bundle_cache=bundle_cache)
+
+    assert "Failed to seed from bundle" in caplog.text
+    assert git_utils.get_local_refs(git.Repo(target_path)) == {"refs/heads/main": source.head.commit.hexsha}
+    # Corrupt bundle is replaced by a valid one
+    assert _get_bundle_refs(bundle_path) == {"refs/heads/main": source.head.commit.hexsha}
+
+
+@pytest.mark.parametrize("refresh_interval, is_refreshed", [(3600, False), (0, True)], ids=["fresh", "stale"])
+def test_bundle_is_refreshed_when_stale(tmp_path: pathlib.Path, refresh_interval: int, is_refreshed: bool):
+    bundle_cache = git_utils.BundleCache(path=str(tmp_path / "bundles"), refresh_interval=refresh_interval)
+    task, source, _ = _create_task(tmp_path)
+    bundle_path = bundle_cache.get_bundle_path(source=task.source, target=task.target)
+    old_sha = source.head.commit.hexsha
+
+    git_utils.sync_repo(task=task, logger=logger, bundle_cache=bundle_cache)
+    new_sha = git_repos_utils.add_commit(source, files={"file.txt": b"updated"})
+    git_utils.sync_repo(task=task, logger=logger, bundle_cache=bundle_cache)
+
+    assert _get_bundle_refs(bundle_path) == {"refs/heads/main": new_sha if is_refreshed else old_sha}
+
+
+def test_bundle_of_filtered_refs_is_exported(tmp_path: pathlib.Path):
+    bundle_cache = git_utils.BundleCache(path=str(tmp_path / "bundles"), refresh_interval=3600)
+    export_path = str(tmp_path / "export" / "repo.bundle")
+    task, source, _ = _create_task(tmp_path, bundle_export_path=export_path, exclude_ref=["refs/heads/secret"])
+    source.git.branch("secret")
+
+    git_utils.sync_repo(task=task, logger=logger, bundle_cache=bundle_cache)
+
+    assert _get_bundle_refs(export_path) == {"refs/heads/main": source.head.commit.hexsha}
+    with (
+        open(export_path, "rb") as export_file,
+        open(bundle_cache.get_bundle_path(source=task.source, target=task.target), "rb") as bundle_file,
+    ):
+        assert export_file.read() == bundle_file.read()
@@ -0,0 +1,130 @@
+import logging
+import os
+import pathlib
+import shutil
+import stat
+
+import git
+import pytest
+
+import lib.utils.git as git_utils
+import tests.utils.git_repos as git_repos_utils
+import tests.utils.ssh_server as ssh_server_utils
+
+pytest.importorskip("dulwich")
+
+import lib.utils.git.dulwich_engine as dulwich_engine_utils  # noqa: E402 # skipped without dulwich
+
+logger = logging.getLogger(__name__)
+
+
+def _create_task(
+    source: str,
+    target: str,
+    exclude_ref: list[str] | None = None,
+    ssh_multiplexing: git_utils.SshMultiplexing | None = None,
+) -> git_utils.SyncRepoTask:
+    return git_utils.SyncRepoTask(
+        source=source,
+        target=target,
+        ref_filter=git_utils.get_ref_filter(
+            include_ref=[],
+            include_ref_regex=[],
+            exclude_ref=exclude_ref or [],
+            exclude_ref_regex=[],
+        ),
+        track_ref_changes=True,
+        ssh_multiplexing=ssh_multiplexing,
+        engine="dulwich",
+    )
+
+
+def _add_reject_hook(target_path: str, ref: str) -> None:
+    hook_path = os.path.join(target_path, "hooks", "update")
+    with open(hook_path, "w") as file:
+        file.write(f'#!/bin/sh\ntest "$1" != "{ref}"\n')
+    os.chmod(hook_path, os.stat(hook_path).st_mode | stat.S_IXUSR)
+
+
+def test_refs_are_mirrored(tmp_path: pathlib.Path):
+    source = git_repos_utils.create_repo(str(tmp_path / "source"), files={"file.txt": b"initial"})
+    old_sha = source.head.commit.hexsha
+    target_path = str(tmp_path / "target.git")
+    git_repos_utils.create_bare_repo(target_path)
+    task = _create_task(source=f"file://{source.working_dir}", target=f"file://{target_path}")
+
+    source.git.branch("stale")
+    git_utils.sync_repo(task=task, logger=logger)
+
+    source.git.branch("-D", "stale")
+    source.git.branch("feature")
+    source.git.tag("-a", "v1", "-m", "v1")
+    new_sha = git_repos_utils.add_commit(source, files={"file.txt": b"updated"})
+    result = git_utils.sync_repo(task=task, logger=logger)
+
+    source_refs = git_utils.get_local_refs(source)
+    assert git_utils.get_local_refs(git.Repo(target_path)) == source_refs
+    assert result.repo_size > 0
+    assert result.ref_changes == [
+        git_utils.RefChange(ref="refs/heads/feature", old_sha=None, new_sha=old_sha, type="created"),
+        git_utils.RefChange(ref="refs/heads/main", old_sha=old_sha, new_sha=new_sha, type="updated"),
+        git_utils.RefChange(ref="refs/tags/v1", old_sha=None, new_sha=source_refs["refs/tags/v1"], type="created"),
+        git_utils.RefChange(ref="refs/heads/stale", old_sha=old_sha, new_sha=None, type="deleted"),
+    ]
+
+
+def test_excluded_refs_are_not_mirrored(tmp_path: pathlib.Path):
+    source = git_repos_utils.create_repo(str(tmp_path / "source"), files={"file.txt": b"initial"})
+    git_repos_utils.add_commit(source, files={"secret.txt": b"secret"})
+    source.git.branch("secret")
+    source.git.reset("--hard", "HEAD~1")
+    target_path = str(tmp_path / "target.git")
+    git_repos_utils.create_bare_repo(target_path)
+    task = _create_task(
+        source=f"file://{source.working_dir}",
+        target=f"file://{target_path}",
+        exclude_ref=["refs/heads/secret"],
+    )
+
+    git_utils.sync_repo(task=task, logger=logger)
+
+    target = git.Repo(target_path)
+    assert git_utils.get_local_refs(target) == {"refs/heads/main": source.head.commit.hexsha}
+    # Only included refs are fetched, so objects of excluded ones are not pushed either
+    assert not target.git.cat_file("-e", source.refs["secret"].commit.hexsha, with_exceptions=False)
+
+
+@pytest.mark.skipif(shutil.which("ssh") is None, reason="ssh client is not installed")
+def test_refs_are_mirrored_over_ssh(tmp_path: pathlib.Path):
+    source = git_repos_utils.create_repo(str(tmp_path / "source"), files={"file.txt": b"initial"})
+    target_path = str(tmp_path / "target.git")
+    git_repos_utils.create_bare_repo(target_path)
+    _add_reject_hook(target_path, ref="refs/heads/protected")
+    control_masters = git_utils.SshControlMasters(
+        control_persist=60,
+        command=ssh_server_utils.create_client_command(str(tmp_path)),
+    )
+    control_masters.prepare()
+
+    with ssh_server_utils.SshServer() as ssh_server:
+        task = _create_task(
+            source=f"ssh://git@127.0.0.1:{ssh_server.port}{source.working_dir}",
+            target=f"ssh://git@127.0.0.1:{ssh_server.port}{target_path}",
+            ssh_multiplexing=control_masters.multiplexing,
+        )
+        try:
+            git_utils.sync_repo(task=task, logger=logger)
+
+            assert git_utils.get_local_refs(git.Repo(target_path)) == {
+                "refs/heads/main": source.head.commit.hexsha,
+            }
+
+            # Ref rejected by receive-pack of target is reported per ref
+            source.git.branch("protected")
+            with pytest.raises(dulwich_engine_utils.DulwichPushError) as exc_info:
+                git_utils.sync_repo(task=task, logger=logger)
+        finally:
+            control_masters.close()
+
+    assert list(exc_info.value.ref_errors) == ["refs/heads/protected"]
+    assert git_utils.get_local_refs(git.Repo(target_path)) == {"refs/heads/main": source.head.commit.hexsha}
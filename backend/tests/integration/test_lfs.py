@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import pathlib
+import typing
+
+import git
+import pytest
+
+import lib.utils.git as git_utils
+import tests.utils.git_repos as git_repos_utils
+import tests.utils.lfs_server as lfs_server_utils
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(name="lfs_server")
+def fixture_lfs_server() -> typing.Iterator[lfs_server_utils.LfsServer]:
+    with lfs_server_utils.LfsServer() as server:
+        yield server
+
+
+def _get_oid(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _get_pointer(data: bytes) -> bytes:
+    return f"version https://git-lfs.github.com/spec/v1\noid sha256:{_get_oid(data)}\nsize {len(data)}\n".encode()
+
+
+def _create_task(
+    tmp_path: pathlib.Path,
+    lfs_server: lfs_server_utils.LfsServer,
+    name: str,
+    objects: list[bytes],
+    lfs_cache: git_utils.LfsCache | None = None,
+) -> tuple[git_utils.SyncRepoTask, str]:
+    """
+    Creates source repo with pointers of objects and empty target repo, source LFS server has all objects.
+    """
+    source = git_repos_utils.create_repo(
+        str(tmp_path / f"{name}-source"),
+        files={f"object-{index}.bin": _get_pointer(data) for index, data in enumerate(objects)},
+    )
+    for data in objects:
+        lfs_server.objects[f"{name}-source"][_get_oid(data)] = data
+    target_path = str(tmp_path / f"{name}-target.git")
+    git_repos_utils.create_bare_repo(target_path)
+
+    task = git_utils.SyncRepoTask(
+        source=f"file://{source.working_dir}",
+        target=f"file://{target_path}",
+        ref_filter=git_utils.get_ref_filter(include_ref=[], include_ref_regex=[], exclude_ref=[], exclude_ref_regex=[]),
+        lfs=git_utils.LfsMirroring(
+            source_url=lfs_server.get_lfs_url(f"{name}-source"),
+            target_url=lfs_server.get_lfs_url(f"{name}-target"),
+        ),
+        lfs_cache=lfs_cache,
+    )
+    return task, target_path
+
+
+def test_objects_present_on_target_are_skipped(tmp_path: pathlib.Path, lfs_server: lfs_server_utils.LfsServer):
+    present, missing = b"present" * 1000, b"missing" * 1000
+    task, _ = _create_task(tmp_path, lfs_server, name="repo", objects=[present, missing])
+    lfs_server.objects["repo-target"][_get_oid(present)] = present
+
+    git_utils.sync_repo(task=task, logger=logger)
+
+    assert lfs_server.objects["repo-target"] == {_get_oid(present): present, _get_oid(missing): missing}
+    assert lfs_server.get_transfer_count("download", "repo-source") == 1
+    assert lfs_server.get_transfer_count("upload", "repo-target") == 1
+
+    git_utils.sync_repo(task=task, logger=logger)
+
+    assert lfs_server.get_transfer_count("download", "repo-source") == 1
+    assert lfs_server.get_transfer_count("upload", "repo-target") == 1
+
+
+def test_cached_objects_are_shared_by_repos(tmp_path: pathlib.Path, lfs_server: lfs_server_utils.LfsServer):
+    shared = b"shared" * 1000
+    lfs_cache = git_utils.LfsCache(path=str(tmp_path / "lfs-cache"))
+    first_task, _ = _create_task(tmp_path, lfs_server, name="first", objects=[shared], lfs_cache=lfs_cache)
+    second_task, _ = _create_task(tmp_path, lfs_server, name="second", objects=[shared], lfs_cache=lfs_cache)
+
+    git_utils.sync_repo(task=first_task, logger=logger)
+    git_utils.sync_repo(task=second_task, logger=logger)
+
+    assert lfs_server.get_transfer_count("download", "first-source") == 1
+    assert lfs_server.get_transfer_count("download", "second-source") == 0
+    assert lfs_server.objects["first-target"] == {_get_oid(shared): shared}
+    assert lfs_server.objects["second-target"] == {_get_oid(shared): shared}
+
+
+def test_objects_of_mirrored_commits_are_not_scanned_again(
+    tmp_path: pathlib.Path,
+    lfs_server: lfs_server_utils.LfsServer,
+):
+    first, second = b"first" * 1000, b"second" * 1000
+    lfs_cache = git_utils.LfsCache(path=str(tmp_path / "lfs-cache"))
+    task, _ = _create_task(tmp_path, lfs_server, name="repo", objects=[first], lfs_cache=lfs_cache)
+
+    git_utils.sync_repo(task=task, logger=logger)
+
+    assert lfs_server.get_batch_object_count("upload", "repo-target") == 1
+
+    lfs_server.objects["repo-source"][_get_oid(second)] = second
+    git_repos_utils.add_commit(git.Repo(str(tmp_path / "repo-source")), files={"second.bin": _get_pointer(second)})
+    git_utils.sync_repo(task=task, logger=logger)
+
+    # Only pointer of new commit is checked against target
+    assert lfs_server.get_batch_object_count("upload", "repo-target") == 2
+    assert lfs_server.objects["repo-target"] == {_get_oid(first): first, _get_oid(second): second}
+
+
+def test_mirrored_commits_missing_in_source_are_ignored(
+    tmp_path: pathlib.Path,
+    lfs_server: lfs_server_utils.LfsServer,
+):
+    data = b"data" * 1000
+    lfs_cache = git_utils.LfsCache(path=str(tmp_path / "lfs-cache"))
+    task, _ = _create_task(tmp_path, lfs_server, name="repo", objects=[data], lfs_cache=lfs_cache)
+    lfs_cache.save_mirrored_commits(source=task.source, target=task.target, commits=["1" * 40])
+
+    git_utils.sync_repo(task=task, logger=logger)
+
+    assert lfs_server.objects["repo-target"] == {_get_oid(data): data}
+
+
+@pytest.mark.parametrize("served", [b"corrupts" * 1000, b"truncated"], ids=["sha", "size"])
+def test_object_not_matching_pointer_is_rejected(
+    tmp_path: pathlib.Path,
+    lfs_server: lfs_server_utils.LfsServer,
+    served: bytes,
+):
+    expected = b"expected" * 1000  # same size as corrupted object
+    lfs_cache = git_utils.LfsCache(path=str(tmp_path / "lfs-cache"))
+    task, target_path = _create_task(tmp_path, lfs_server, name="repo", objects=[expected], lfs_cache=lfs_cache)
+    lfs_server.objects["repo-source"][_get_oid(expected)] = served
+
+    with pytest.raises(git_utils.LfsError, match="does not match its pointer"):
+        git_utils.sync_repo(task=task, logger=logger)
+
+    assert lfs_server.objects["repo-target"] == {}
+    # Neither mismatching object nor its partial download is kept in cache
+    assert [file_name for _, _, file_names in os.walk(lfs_cache.path) for file_name in file_names] == []
+    # Refs are not pushed while their LFS objects are missing on target
+    assert git_utils.get_local_refs(git.Repo(target_path)) == {}
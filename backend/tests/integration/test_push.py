@@ -0,0 +1,112 @@
+import logging
+import os
+import pathlib
+import stat
+
+import git
+import pytest
+
+import lib.utils.git as git_utils
+import tests.utils.git_repos as git_repos_utils
+
+logger = logging.getLogger(__name__)
+
+_REMOTE_NAME = "destination"
+
+
+def _create_repos(tmp_path: pathlib.Path, branch_count: int) -> tuple[git.Repo, str]:
+    """
+    Creates source repo with main and branch_count branches, each on its own commit, and empty target.
+    """
+    source = git_repos_utils.create_repo(str(tmp_path / "source"), files={"file.txt": b"initial"})
+    for index in range(branch_count):
+        git_repos_utils.add_commit(source, files={"file.txt": f"branch-{index}".encode()})
+        source.git.branch(f"branch-{index}")
+    target_path = str(tmp_path / "target.git")
+    git_repos_utils.create_bare_repo(target_path)
+    source.create_remote(_REMOTE_NAME, url=f"file://{target_path}")
+
+    return source, target_path
+
+
+def _add_update_hook(target_path: str, script: str) -> None:
+    """
+    Adds update hook to target, it runs once per pushed ref with ref name as $1, non-zero exit rejects ref.
+    """
+    hook_path = os.path.join(target_path, "hooks", "update")
+    with open(hook_path, "w") as file:
+        file.write(f"#!/bin/sh\n{script}\n")
+    os.chmod(hook_path, os.stat(hook_path).st_mode | stat.S_IXUSR)
+
+
+def _push(source: git.Repo, batch_size: int = 2, max_workers: int = 4) -> list[git_utils.PushBatchResult]:
+    return git_utils.push_in_batches(
+        repo=source,
+        remote_name=_REMOTE_NAME,
+        batch_size=batch_size,
+        max_workers=max_workers,
+        retries=2,
+        logger=logger,
+    )
+
+
+def test_refs_are_pushed_in_batches(tmp_path: pathlib.Path):
+    source, target_path = _create_repos(tmp_path, branch_count=4)
+
+    batches = _push(source)
+
+    assert [len(batch.refspecs) for batch in batches] == [2, 2, 1]
+    assert all(batch.is_successful and batch.attempts == 1 for batch in batches)
+    assert git_utils.get_local_refs(git.Repo(target_path)) == git_utils.get_local_refs(source)
+
+
+def test_first_batch_is_pushed_before_the_rest(tmp_path: pathlib.Path):
+    source, target_path = _create_repos(tmp_path, branch_count=6)
+    log_path = str(tmp_path / "pushed.log")
+    _add_update_hook(target_path, f'echo "$1" >> {log_path}')
+
+    batches = _push(source)
+
+    with open(log_path) as file:
+        pushed = file.read().splitlines()
+    first_refs = {refspec.split(":")[1] for refspec in batches[0].refspecs}
+    assert set(pushed[: len(first_refs)]) == first_refs
+
+
+def test_refs_missing_locally_are_deleted(tmp_path: pathlib.Path):
+    source, target_path = _create_repos(tmp_path, branch_count=2)
+    _push(source)
+
+    source.git.branch("-D", "branch-0")
+    batches = _push(source)
+
+    assert [batch.refspecs for batch in batches] == [[":refs/heads/branch-0"]]
+    assert "refs/heads/branch-0" not in git_utils.get_local_refs(git.Repo(target_path))
+
+
+def test_only_failed_batch_is_retried(tmp_path: pathlib.Path):
+    source, target_path = _create_repos(tmp_path, branch_count=4)
+    marker_path = str(tmp_path / "rejected")
+    # branch-1 is rejected once
+    _add_update_hook(
+        target_path,
+        f'if [ "$1" = refs/heads/branch-1 ] && [ ! -e {marker_path} ]; then touch {marker_path}; exit 1; fi',
+    )
+
+    batches = _push(source)
+
+    assert {batch.index: batch.attempts for batch in batches} == {0: 2, 1: 1, 2: 1}
+    assert git_utils.get_local_refs(git.Repo(target_path)) == git_utils.get_local_refs(source)
+
+
+def test_batch_failing_all_retries_raises_push_error(tmp_path: pathlib.Path):
+    source, target_path = _create_repos(tmp_path, branch_count=4)
+    _add_update_hook(target_path, 'test "$1" != refs/heads/branch-3')
+
+    with pytest.raises(git_utils.PushError) as exc_info:
+        _push(source)
+
+    assert [(batch.index, batch.attempts) for batch in exc_info.value.failed_batches] == [(1, 3)]
+    target_refs = git_utils.get_local_refs(git.Repo(target_path))
+    assert "refs/heads/branch-3" not in target_refs
+    assert "refs/heads/main" in target_refs
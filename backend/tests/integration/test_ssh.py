@@ -0,0 +1,120 @@
+import glob
+import logging
+import os
+import pathlib
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import typing
+
+import git
+import pytest
+
+import lib.utils.git as git_utils
+import tests.utils.git_repos as git_repos_utils
+import tests.utils.ssh_server as ssh_server_utils
+
+logger = logging.getLogger(__name__)
+
+pytestmark = pytest.mark.skipif(shutil.which("ssh") is None, reason="ssh client is not installed")
+
+# Socket path limit minus socket name, temporary suffix ssh adds and path separator
+_MAX_CONTROL_DIR_LENGTH = 49 if sys.platform == "linux" else 45
+
+
+@pytest.fixture(name="ssh_server")
+def fixture_ssh_server() -> typing.Iterator[ssh_server_utils.SshServer]:
+    with ssh_server_utils.SshServer() as server:
+        yield server
+
+
+@pytest.fixture(name="ssh_command")
+def fixture_ssh_command(tmp_path: pathlib.Path) -> str:
+    return ssh_server_utils.create_client_command(str(tmp_path))
+
+
+@pytest.fixture(name="short_tmp_path")
+def fixture_short_tmp_path() -> typing.Iterator[str]:
+    # pytest tmp_path is too long for control directories near unix socket path limit
+    path = tempfile.mkdtemp(prefix="ssh-")
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _get_control_sockets(control_dir: str) -> list[str]:
+    return [path for path in glob.glob(os.path.join(control_dir, "*")) if stat.S_ISSOCK(os.stat(path).st_mode)]
+
+
+def _sync_over_ssh(
+    tmp_path: pathlib.Path,
+    ssh_server: ssh_server_utils.SshServer,
+    multiplexing: git_utils.SshMultiplexing,
+    name: str,
+) -> None:
+    source = git_repos_utils.create_repo(str(tmp_path / f"{name}-source"), files={"file.txt": name.encode()})
+    target_path = str(tmp_path / f"{name}-target.git")
+    git_repos_utils.create_bare_repo(target_path)
+
+    task = git_utils.SyncRepoTask(
+        source=f"ssh://git@127.0.0.1:{ssh_server.port}{source.working_dir}",
+        target=f"ssh://git@127.0.0.1:{ssh_server.port}{target_path}",
+        ref_filter=git_utils.get_ref_filter(include_ref=[], include_ref_regex=[], exclude_ref=[], exclude_ref_regex=[]),
+        ssh_multiplexing=multiplexing,
+    )
+    git_utils.sync_repo(task=task, logger=logger)
+
+    assert git_utils.get_local_refs(git.Repo(target_path)) == {
+        "refs/heads/main": source.head.commit.hexsha,
+    }
+
+
+def test_syncs_to_same_host_share_control_master(
+    tmp_path: pathlib.Path,
+    ssh_server: ssh_server_utils.SshServer,
+    ssh_command: str,
+):
+    # Temporary control directory is short enough for unix socket path limit
+    control_masters = git_utils.SshControlMasters(control_persist=60, command=ssh_command)
+    control_dir = control_masters.multiplexing.control_dir
+    control_masters.prepare()
+
+    for name in ["first", "second"]:
+        _sync_over_ssh(tmp_path, ssh_server, control_masters.multiplexing, name=name)
+
+    # Every git process of both syncs has used connection of one master
+    assert ssh_server.connection_count == 1
+    assert len(_get_control_sockets(control_dir)) == 1
+
+    control_masters.close()
+
+    assert not os.path.exists(control_dir)
+    deadline = time.monotonic() + 5
+    while ssh_server.active_connection_count > 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert ssh_server.active_connection_count == 0
+
+
+def test_longest_control_dir_is_usable(
+    tmp_path: pathlib.Path,
+    short_tmp_path: str,
+    ssh_server: ssh_server_utils.SshServer,
+    ssh_command: str,
+):
+    control_dir = os.path.join(short_tmp_path, "x" * (_MAX_CONTROL_DIR_LENGTH - len(short_tmp_path) - 1))
+    control_masters = git_utils.SshControlMasters(control_persist=60, control_dir=control_dir, command=ssh_command)
+    control_masters.prepare()
+
+    _sync_over_ssh(tmp_path, ssh_server, control_masters.multiplexing, name="repo")
+
+    assert len(_get_control_sockets(control_dir)) == 1
+    control_masters.close()
+
+
+def test_too_long_control_dir_is_rejected(short_tmp_path: str):
+    control_dir = os.path.join(short_tmp_path, "x" * (_MAX_CONTROL_DIR_LENGTH - len(short_tmp_path)))
+    control_masters = git_utils.SshControlMasters(control_persist=60, control_dir=control_dir)
+
+    with pytest.raises(ValueError, match="bytes are supported"):
+        control_masters.prepare()
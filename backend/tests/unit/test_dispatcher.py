@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+import lib.utils.aiojobs as aiojobs_utils
+
+
+async def _run_job(
+    dispatcher: aiojobs_utils.PriorityDispatcher,
+    name: str,
+    last_success_at: float,
+    priority: float,
+    admitted: list[str],
+) -> None:
+    async with dispatcher.slot(last_success_at=last_success_at, priority=priority):
+        admitted.append(name)
+
+
+async def _wait_queued(dispatcher: aiojobs_utils.PriorityDispatcher, count: int) -> None:
+    while dispatcher.queued_count < count:
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_slot_limits_active_jobs():
+    dispatcher = aiojobs_utils.PriorityDispatcher(max_workers=2)
+    now = asyncio.get_running_loop().time()
+    admitted: list[str] = []
+
+    async with dispatcher.slot(last_success_at=now), dispatcher.slot(last_success_at=now):
+        task = asyncio.create_task(_run_job(dispatcher, "waiting", now, 1.0, admitted))
+        await _wait_queued(dispatcher, 1)
+
+        assert dispatcher.active_count == 2
+        assert admitted == []
+
+    await task
+    assert admitted == ["waiting"]
+    assert dispatcher.active_count == 0
+    assert dispatcher.queued_count == 0
+
+
+@pytest.mark.asyncio
+async def test_most_stale_job_is_admitted_first():
+    dispatcher = aiojobs_utils.PriorityDispatcher(max_workers=1)
+    now = asyncio.get_running_loop().time()
+    admitted: list[str] = []
+
+    async with dispatcher.slot(last_success_at=now):
+        tasks = [
+            asyncio.create_task(_run_job(dispatcher, "fresh", now - 10, 1.0, admitted)),
+            asyncio.create_task(_run_job(dispatcher, "stale", now - 30, 1.0, admitted)),
+            asyncio.create_task(_run_job(dispatcher, "prioritized", now - 20, 2.0, admitted)),
+        ]
+        await _wait_queued(dispatcher, 3)
+
+    await asyncio.gather(*tasks)
+    assert admitted == ["prioritized", "stale", "fresh"]
+
+
+@pytest.mark.asyncio
+async def test_staleness_is_weighted_at_release_time():
+    dispatcher = aiojobs_utils.PriorityDispatcher(max_workers=1)
+    now = asyncio.get_running_loop().time()
+    admitted: list[str] = []
+
+    async with dispatcher.slot(last_success_at=now):
+        tasks = [
+            # Less stale while waiting starts, but its staleness grows twice as fast
+            asyncio.create_task(_run_job(dispatcher, "prioritized", now, 2.0, admitted)),
+            asyncio.create_task(_run_job(dispatcher, "stale", now - 0.05, 1.0, admitted)),
+        ]
+        await _wait_queued(dispatcher, 2)
+        await asyncio.sleep(0.2)
+
+    await asyncio.gather(*tasks)
+    assert admitted == ["prioritized", "stale"]
+
+
+@pytest.mark.asyncio
+async def test_equally_stale_jobs_are_admitted_in_arrival_order():
+    dispatcher = aiojobs_utils.PriorityDispatcher(max_workers=1)
+    now = asyncio.get_running_loop().time()
+    admitted: list[str] = []
+
+    async with dispatcher.slot(last_success_at=now):
+        tasks: list[asyncio.Task[None]] = []
+        for index in range(3):
+            tasks.append(asyncio.create_task(_run_job(dispatcher, str(index), now, 1.0, admitted)))
+            await _wait_queued(dispatcher, index + 1)
+
+    await asyncio.gather(*tasks)
+    assert admitted == ["0", "1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_is_skipped():
+    dispatcher = aiojobs_utils.PriorityDispatcher(max_workers=1)
+    now = asyncio.get_running_loop().time()
+    admitted: list[str] = []
+
+    async with dispatcher.slot(last_success_at=now):
+        cancelled = asyncio.create_task(_run_job(dispatcher, "cancelled", now - 20, 1.0, admitted))
+        waiting = asyncio.create_task(_run_job(dispatcher, "waiting", now - 10, 1.0, admitted))
+        await _wait_queued(dispatcher, 2)
+
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert dispatcher.queued_count == 1
+
+    await waiting
+    assert admitted == ["waiting"]
+    assert dispatcher.active_count == 0
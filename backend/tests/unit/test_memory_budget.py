@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+import lib.utils.git as git_utils
+
+
+@pytest.mark.asyncio
+async def test_reservation_waits_for_released_memory():
+    budget = git_utils.MemoryBudget(total=100)
+    reserved = asyncio.Event()
+
+    async def reserve() -> None:
+        async with budget.reserve(80):
+            reserved.set()
+
+    async with budget.reserve(60):
+        task = asyncio.create_task(reserve())
+        await asyncio.sleep(0.01)
+        assert not reserved.is_set()
+        assert budget.available == 40
+
+    await task
+    assert reserved.is_set()
+    assert budget.available == 100
+
+
+@pytest.mark.asyncio
+async def test_reservation_larger_than_budget_runs_alone():
+    budget = git_utils.MemoryBudget(total=100)
+
+    async with budget.reserve(1000):
+        assert budget.available == 0
+
+    assert budget.available == 100
+
+
+@pytest.mark.asyncio
+async def test_large_reservation_is_not_starved_by_overlapping_small_ones():
+    budget = git_utils.MemoryBudget(total=100)
+    order: list[str] = []
+
+    async def reserve(name: str, amount: int) -> None:
+        async with budget.reserve(amount):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def reserve_small(name: str) -> None:
+        # Each small reservation overlaps with the next one, so the budget is never fully free without queueing
+        for index in range(5):
+            await reserve(f"{name}-{index}", 30)
+
+    small_tasks = [asyncio.create_task(reserve_small(name)) for name in ["a", "b"]]
+    await asyncio.sleep(0.005)
+    large_task = asyncio.create_task(reserve("large", 1000))
+
+    await asyncio.wait_for(asyncio.gather(large_task, *small_tasks), timeout=1)
+
+    # Small reservations requested after the large one wait for it
+    assert order.index("large") == 2
+    assert budget.available == 100
+
+
+@pytest.mark.asyncio
+async def test_cancelled_reservation_lets_next_waiters_in():
+    budget = git_utils.MemoryBudget(total=100)
+
+    small_reserved = asyncio.Event()
+
+    async def reserve_large() -> None:
+        async with budget.reserve(100):
+            pass
+
+    async def reserve_small() -> None:
+        async with budget.reserve(30):
+            small_reserved.set()
+
+    async with budget.reserve(60):
+        large_task = asyncio.create_task(reserve_large())
+        await asyncio.sleep(0)
+        small_task = asyncio.create_task(reserve_small())
+        await asyncio.sleep(0.01)
+        assert not small_reserved.is_set()
+
+        large_task.cancel()
+        await asyncio.wait_for(small_task, timeout=1)
+        assert small_reserved.is_set()
+
+    assert budget.available == 100
@@ -0,0 +1,110 @@
+import asyncio
+import contextlib
+import logging
+import pathlib
+import typing
+
+import pytest
+
+import lib.utils.aiojobs as aiojobs_utils
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(name="lane")
+def fixture_lane() -> typing.Iterator[aiojobs_utils.Lane]:
+    lane = aiojobs_utils.Lane.from_max_workers(name="default", max_workers=1)
+    yield lane
+    lane.executor.shutdown()
+
+
+def _create_monitor(lane: aiojobs_utils.Lane, metrics_path: pathlib.Path) -> aiojobs_utils.Monitor:
+    return aiojobs_utils.Monitor(
+        lanes=[lane],
+        sample_interval=1,
+        report_interval=60,
+        loop_lag_warning=0.5,
+        queued_warning=2,
+        metrics_path=str(metrics_path),
+        metrics_prefix="test",
+        logger=logger,
+    )
+
+
+async def _wait_slot(lane: aiojobs_utils.Lane, last_success_at: float) -> None:
+    async with lane.dispatcher.slot(last_success_at=last_success_at):
+        pass
+
+
+@contextlib.asynccontextmanager
+async def _occupy(lane: aiojobs_utils.Lane, queued: int) -> typing.AsyncIterator[None]:
+    """
+    Holds the only worker of lane with queued jobs waiting for it.
+    """
+    now = asyncio.get_running_loop().time()
+    async with lane.dispatcher.slot(last_success_at=now):
+        waiters = [asyncio.create_task(_wait_slot(lane, last_success_at=now)) for _ in range(queued)]
+        while lane.dispatcher.queued_count < queued:
+            await asyncio.sleep(0)
+        try:
+            yield
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_sample_below_thresholds_is_reported_without_warnings(
+    lane: aiojobs_utils.Lane,
+    tmp_path: pathlib.Path,
+    caplog: pytest.LogCaptureFixture,
+):
+    caplog.set_level(logging.INFO)
+    metrics_path = tmp_path / "metrics.prom"
+    monitor = _create_monitor(lane, metrics_path)
+
+    async with _occupy(lane, queued=1):
+        sample = monitor._collect(loop_lag=0.1)
+        monitor._report(sample)
+
+    assert sample == aiojobs_utils.MonitorSample(
+        loop_lag=0.1,
+        running_jobs=1,
+        lanes=[aiojobs_utils.LaneSample(name="default", max_workers=1, active=1, queued=1)],
+    )
+    assert [record.levelno for record in caplog.records] == [logging.INFO]
+    assert metrics_path.read_text().splitlines() == [
+        "test_loop_lag_seconds 0.1",
+        "test_running_jobs 1",
+        'test_lane_max_workers{lane="default"} 1',
+        'test_lane_active{lane="default"} 1',
+        'test_lane_queued{lane="default"} 1',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sample_crossing_thresholds_is_warned(
+    lane: aiojobs_utils.Lane,
+    tmp_path: pathlib.Path,
+    caplog: pytest.LogCaptureFixture,
+):
+    metrics_path = tmp_path / "metrics.prom"
+    monitor = _create_monitor(lane, metrics_path)
+
+    async with _occupy(lane, queued=2):
+        monitor._report(monitor._collect(loop_lag=0.5))
+
+    warnings = [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING]
+    assert warnings == [
+        "Event loop lag 0.500 seconds exceeds 0.500 seconds, event loop is blocked",
+        "Lane 'default' has 2 queued jobs with 1/1 workers busy, executor is saturated",
+    ]
+    assert 'test_lane_queued{lane="default"} 2' in metrics_path.read_text().splitlines()
+
+
+@pytest.mark.asyncio
+async def test_idle_lanes_report_no_running_jobs(lane: aiojobs_utils.Lane, tmp_path: pathlib.Path):
+    monitor = _create_monitor(lane, tmp_path / "metrics.prom")
+
+    assert monitor._collect(loop_lag=0).running_jobs == 0
@@ -0,0 +1,22 @@
+import lib.utils.git as git_utils
+
+
+def test_mirror_refspecs_push_heads_first_and_deletions_last():
+    local_refs = {
+        "refs/changes/01/1/1": "a",
+        "refs/heads/main": "b",
+        "refs/heads/unchanged": "c",
+        "refs/tags/v1": "d",
+    }
+    remote_refs = {
+        "refs/heads/main": "old",
+        "refs/heads/unchanged": "c",
+        "refs/heads/deleted": "e",
+    }
+
+    assert git_utils.get_mirror_refspecs(local_refs=local_refs, remote_refs=remote_refs) == [
+        "+refs/heads/main:refs/heads/main",
+        "+refs/changes/01/1/1:refs/changes/01/1/1",
+        "+refs/tags/v1:refs/tags/v1",
+        ":refs/heads/deleted",
+    ]
@@ -0,0 +1,79 @@
+import sys
+
+import pydantic
+import pytest
+
+import lib.app.settings as settings
+
+
+def test_repo_push_max_workers_must_be_positive():
+    with pytest.raises(pydantic.ValidationError, match="push_max_workers must be at least 1"):
+        settings.RepoSyncSettings(source="source", target="target", push_max_workers=0)
+
+
+@pytest.mark.parametrize("priority", [0, -1])
+def test_repo_priority_must_be_positive(priority: float):
+    with pytest.raises(pydantic.ValidationError, match="priority must be positive"):
+        settings.RepoSyncSettings(source="source", target="target", priority=priority)
+
+
+def test_repo_misspelled_key_is_rejected():
+    with pytest.raises(pydantic.ValidationError, match="exclud_ref"):
+        settings.RepoSyncSettings.model_validate(
+            {"source": "source", "target": "target", "exclud_ref": ["refs/heads/secret"]},
+        )
+
+
+def test_repo_misspelled_key_from_template_is_rejected():
+    with pytest.raises(pydantic.ValidationError, match="exclud_ref"):
+        settings.Settings.model_validate(
+            {
+                "repo_templates": {"template": {"exclud_ref": ["refs/heads/secret"]}},
+                "repos": [{"template": "template", "source": "source", "target": "target"}],
+            },
+        )
+
+
+def test_repo_invalid_ref_regex_is_rejected():
+    with pytest.raises(pydantic.ValidationError, match="Invalid regex"):
+        settings.RepoSyncSettings(source="source", target="target", include_ref_regex=["refs/heads/("])
+
+
+def test_repo_dulwich_engine_requires_dulwich(monkeypatch: pytest.MonkeyPatch):
+    # Engine module import fails the same way as with dulwich group not installed
+    monkeypatch.setitem(sys.modules, "lib.utils.git.dulwich_engine", None)
+
+    with pytest.raises(pydantic.ValidationError, match="poetry install --with dulwich"):
+        settings.RepoSyncSettings(source="source", target="target", engine="dulwich")
+
+
+def test_repo_bundle_export_requires_bundle_cache():
+    with pytest.raises(pydantic.ValidationError, match="requires bundles.path"):
+        settings.Settings.model_validate(
+            {"repos": [{"source": "source", "target": "target", "bundle_export_path": "/mnt/export.bundle"}]},
+        )
+
+
+@pytest.mark.parametrize("source", ["git@github.com:user/repo.git", "file:///srv/repo.git"])
+def test_repo_lfs_url_of_non_http_remote_is_required(source: str):
+    with pytest.raises(pydantic.ValidationError, match="lfs_source_url is required"):
+        settings.RepoSyncSettings(source=source, target="https://gitlab.com/user/repo.git", lfs=True)
+
+    settings.RepoSyncSettings(
+        source=source,
+        target="https://gitlab.com/user/repo.git",
+        lfs=True,
+        lfs_source_url="https://github.com/user/repo.git/info/lfs",
+    )
+
+
+@pytest.mark.parametrize("max_workers", [0, -1])
+def test_lane_max_workers_must_be_positive(max_workers: int):
+    with pytest.raises(pydantic.ValidationError, match="max_workers must be at least 1"):
+        settings.SchedulerSettings.model_validate({"lanes": {"large": {"max_workers": max_workers}}})
+
+
+@pytest.mark.parametrize("signal_name, message", [("SIGNOPE", "Unknown signal"), ("SIGKILL", "can't be handled")])
+def test_profiling_signal_must_be_handleable(signal_name: str, message: str):
+    with pytest.raises(pydantic.ValidationError, match=message):
+        settings.ProfilingSettings(signal=signal_name)
@@ -0,0 +1,18 @@
+import pathlib
+
+import lib.utils.git as git_utils
+
+
+def test_sync_stats_are_kept_per_repo(tmp_path: pathlib.Path):
+    store = git_utils.SyncStatsStore(path=str(tmp_path / "stats"))
+    store.save(source="source", target="target", stats=git_utils.SyncStats(duration=1.5, size=1024))
+
+    assert store.load(source="source", target="target") == git_utils.SyncStats(duration=1.5, size=1024)
+    assert store.load(source="source", target="other") is None
+
+
+def test_corrupted_sync_stats_are_ignored(tmp_path: pathlib.Path):
+    store = git_utils.SyncStatsStore(path=str(tmp_path))
+    pathlib.Path(store.get_stats_path(source="source", target="target")).write_text("{")
+
+    assert store.load(source="source", target="target") is None
@@ -0,0 +1,44 @@
+import os
+
+import git
+
+
+def create_repo(path: str, files: dict[str, bytes], branch: str = "main") -> git.Repo:
+    """
+    Creates non-bare repo with single commit of files on branch.
+    """
+    repo = git.Repo.init(path, initial_branch=branch)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Tests")
+        config.set_value("user", "email", "tests@localhost")
+
+    add_commit(repo, files=files, message="initial")
+
+    return repo
+
+
+def add_commit(repo: git.Repo, files: dict[str, bytes], message: str = "update") -> str:
+    """
+    Writes files to working tree of repo and commits them to current branch, returns commit sha.
+    """
+    assert repo.working_dir is not None
+    for name, data in files.items():
+        file_path = os.path.join(repo.working_dir, name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as file:
+            file.write(data)
+    repo.git.add("--all")
+    repo.git.commit("--allow-empty", "-m", message)
+
+    return repo.head.commit.hexsha
+
+
+def create_bare_repo(path: str) -> git.Repo:
+    return git.Repo.init(path, bare=True)
+
+
+__all__ = [
+    "add_commit",
+    "create_bare_repo",
+    "create_repo",
+]
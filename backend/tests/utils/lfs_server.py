@@ -0,0 +1,121 @@
+import collections
+import http.server
+import json
+import threading
+import typing
+
+_MEDIA_TYPE = "application/vnd.git-lfs+json"
+
+
+class LfsServer:
+    """
+    Local stand-in of Git LFS server for tests, implements batch API with basic transfer for repos by name.
+    Objects are kept in memory, transfers and objects of batch requests are counted per operation and repo.
+    """
+
+    def __init__(self) -> None:
+        self.objects: dict[str, dict[str, bytes]] = collections.defaultdict(dict)
+        self.transfers: collections.Counter[str] = collections.Counter()
+        self.batch_objects: collections.Counter[str] = collections.Counter()
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), self._create_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def get_lfs_url(self, repo_name: str) -> str:
+        return f"{self.url}/{repo_name}/info/lfs"
+
+    def get_transfer_count(self, operation: typing.Literal["download", "upload"], repo_name: str) -> int:
+        with self._lock:
+            return self.transfers[f"{operation}:{repo_name}"]
+
+    def get_batch_object_count(self, operation: typing.Literal["download", "upload"], repo_name: str) -> int:
+        with self._lock:
+            return self.batch_objects[f"{operation}:{repo_name}"]
+
+    def __enter__(self) -> typing.Self:
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _create_handler(self) -> type[http.server.BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: typing.Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                repo_name = self.path.strip("/").split("/")[0]
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self.path.endswith("/objects/batch"):
+                    self._send_json(server.handle_batch(repo_name, body))
+                else:
+                    self._send_json({}, status=200 if body["oid"] in server.objects[repo_name] else 404)
+
+            def do_GET(self) -> None:
+                repo_name, _, oid = self.path.strip("/").split("/")
+                data = server.handle_download(repo_name, oid)
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_PUT(self) -> None:
+                repo_name, _, oid = self.path.strip("/").split("/")
+                server.handle_upload(repo_name, oid, self.rfile.read(int(self.headers["Content-Length"])))
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _send_json(self, body: typing.Any, status: int = 200) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", _MEDIA_TYPE)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def handle_batch(self, repo_name: str, body: dict[str, typing.Any]) -> dict[str, typing.Any]:
+        with self._lock:
+            self.batch_objects[f"{body['operation']}:{repo_name}"] += len(body["objects"])
+
+        objects: list[dict[str, typing.Any]] = []
+        for item in body["objects"]:
+            href = f"{self.url}/{repo_name}/objects/{item['oid']}"
+            exists = item["oid"] in self.objects[repo_name]
+            if body["operation"] == "download":
+                if exists:
+                    objects.append({**item, "actions": {"download": {"href": href}}})
+                else:
+                    objects.append({**item, "error": {"code": 404, "message": "Object does not exist"}})
+            elif exists:
+                # Objects server already has get no actions
+                objects.append(item)
+            else:
+                objects.append({**item, "actions": {"upload": {"href": href}, "verify": {"href": f"{href}/verify"}}})
+
+        return {"transfer": "basic", "objects": objects}
+
+    def handle_download(self, repo_name: str, oid: str) -> bytes:
+        with self._lock:
+            self.transfers[f"download:{repo_name}"] += 1
+        return self.objects[repo_name][oid]
+
+    def handle_upload(self, repo_name: str, oid: str, data: bytes) -> None:
+        with self._lock:
+            self.transfers[f"upload:{repo_name}"] += 1
+        self.objects[repo_name][oid] = data
+
+
+__all__ = [
+    "LfsServer",
+]
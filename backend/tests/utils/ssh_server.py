@@ -0,0 +1,144 @@
+import os
+import socket
+import subprocess
+import threading
+import typing
+
+import paramiko
+import paramiko.common
+
+
+class _ServerInterface(paramiko.ServerInterface):
+    def __init__(self, server: "SshServer") -> None:
+        self._server = server
+
+    def get_allowed_auths(self, username: str) -> str:
+        return "publickey"
+
+    def check_auth_publickey(self, username: str, key: paramiko.PKey) -> int:
+        return paramiko.common.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind: str, chanid: int) -> int:
+        return paramiko.common.OPEN_SUCCEEDED
+
+    def check_channel_exec_request(self, channel: paramiko.Channel, command: bytes) -> bool:
+        threading.Thread(target=self._server.execute, args=(channel, command.decode()), daemon=True).start()
+        return True
+
+
+class SshServer:
+    """
+    Local stand-in of sshd for tests, accepts any public key and executes commands in local shell.
+    Counts accepted connections, so tests can check how many connections clients have opened.
+    """
+
+    def __init__(self) -> None:
+        self._host_key = paramiko.RSAKey.generate(2048)
+        self._socket = socket.socket()
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self._transports: list[paramiko.Transport] = []
+        self._lock = threading.Lock()
+
+        self.connection_count = 0
+
+    @property
+    def port(self) -> int:
+        return self._socket.getsockname()[1]
+
+    @property
+    def active_connection_count(self) -> int:
+        with self._lock:
+            return sum(1 for transport in self._transports if transport.is_active())
+
+    def __enter__(self) -> typing.Self:
+        self._socket.listen(16)
+        threading.Thread(target=self._serve, daemon=True).start()
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        # Close alone leaves socket listening while accept is blocked on it, shutdown wakes accept up
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        with self._lock:
+            for transport in self._transports:
+                transport.close()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                client, _ = self._socket.accept()
+            except OSError:
+                return
+
+            transport = paramiko.Transport(client)
+            transport.add_server_key(self._host_key)
+            with self._lock:
+                self.connection_count += 1
+                self._transports.append(transport)
+            transport.start_server(server=_ServerInterface(self))
+
+    def execute(self, channel: paramiko.Channel, command: str) -> None:
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        assert process.stdin is not None and process.stdout is not None and process.stderr is not None
+
+        def feed_stdin() -> None:
+            assert process.stdin is not None
+            try:
+                while data := channel.recv(65536):
+                    process.stdin.write(data)
+                    process.stdin.flush()
+                process.stdin.close()
+            except BrokenPipeError:
+                # Command has exited without reading all input
+                pass
+
+        def pump_stderr() -> None:
+            assert process.stderr is not None
+            while data := os.read(process.stderr.fileno(), 65536):
+                channel.sendall_stderr(data)
+
+        threading.Thread(target=feed_stdin, daemon=True).start()
+        stderr_thread = threading.Thread(target=pump_stderr, daemon=True)
+        stderr_thread.start()
+        while data := os.read(process.stdout.fileno(), 65536):
+            channel.sendall(data)
+        stderr_thread.join()
+
+        channel.send_exit_status(process.wait())
+        channel.close()
+
+
+def create_client_command(directory: str) -> str:
+    """
+    Creates client key in directory and returns ssh command using it, unaffected by user configuration.
+    """
+    key_path = os.path.join(directory, "key")
+    subprocess.run(["ssh-keygen", "-q", "-t", "ed25519", "-N", "", "-f", key_path], check=True)
+
+    return " ".join(
+        [
+            "ssh -F /dev/null",
+            f"-i {key_path}",
+            "-o IdentitiesOnly=yes",
+            "-o BatchMode=yes",
+            "-o StrictHostKeyChecking=no",
+            "-o UserKnownHostsFile=/dev/null",
+            "-o LogLevel=ERROR",
+        ]
+    )
+
+
+__all__ = [
+    "SshServer",
+    "create_client_command",
+]